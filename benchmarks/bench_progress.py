@@ -0,0 +1,73 @@
+# benchmarks/bench_progress.py
+#
+# Compares generation time with and without a progress callback attached.
+# Usage: python benchmarks/bench_progress.py [--rows N] [--repeat R]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exceltodump.converter import generate_test_elements_xml, generate_test_case_xml
+from exceltodump.progress import combine_callbacks
+
+SECTIONS = ['Precondition', 'Action', 'Expected_Result']
+
+def synthetic_data(rows, operations=50, signals=500):
+    """Builds reader-shaped data with `rows` rows of one call per section."""
+    data = {}
+    text_values = set()
+    for row in range(rows):
+        test_elements = {}
+        testcase = []
+        for offset, section in enumerate(SECTIONS):
+            signal = f'"TV_Signal{(row + offset) % signals}"'
+            text_values.add(signal)
+            operation = {
+                "operation": f"Operation {(row * 3 + offset) % operations}",
+                "parameters": ["Auto_Param_Text", "Auto_Param_Numeric", "", "", ""],
+                "param_details": [
+                    {"category": "Text", "value": signal},
+                    {"category": "Numeric", "value": str(row % 10)},
+                    {"category": "Empty", "value": ""},
+                    {"category": "Empty", "value": ""},
+                    {"category": "Empty", "value": ""}
+                ]
+            }
+            test_elements[section] = {"Descriptions": [], "Operations": [operation]}
+            testcase.append(operation)
+        data[f"Row_{row}"] = {"test-elements": test_elements, "testcase": testcase}
+    data["Generated_Parameters"] = {
+        "Text": sorted(text_values),
+        "Numeric": [str(value) for value in range(10)]
+    }
+    return data
+
+def run(rows, progress):
+    data = synthetic_data(rows)
+    started = time.perf_counter()
+    test_elements_xml, interactions, parameter_mapping, representative_mapping = \
+        generate_test_elements_xml(data, progress=progress)
+    generate_test_case_xml(data, interactions, parameter_mapping, representative_mapping, progress=progress)
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the overhead of progress events.')
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    events = []
+    callback = combine_callbacks(events.append)
+    baseline = min(run(args.rows, None) for _ in range(args.repeat))
+    with_events = min(run(args.rows, callback) for _ in range(args.repeat))
+
+    print(f"rows: {args.rows}, best of {args.repeat}")
+    print(f"without progress: {baseline:.3f}s")
+    print(f"with progress:    {with_events:.3f}s ({len(events) // args.repeat} events per run)")
+    print(f"overhead:         {100 * (with_events - baseline) / baseline:+.1f}%")
+
+if __name__ == "__main__":
+    main()
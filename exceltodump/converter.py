@@ -1,14 +1,29 @@
 # exceltodump/converter.py
 
+import copy
 import json
 import random
+import re
 import zipfile
 import os 
 import uuid
 from collections import defaultdict
-from xml.etree.ElementTree import Element, SubElement, tostring, parse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from xml.etree.ElementTree import Element, SubElement, tostring, parse, fromstring
 import xml.dom.minidom
 import logging
+from .progress import ProgressTracker
+
+# Datatypes created when the workbook has no values of their own, with their default representatives
+DEFAULT_DATATYPES = {
+    "Empty": [""],  # Representative is empty string
+    "Text": ["Auto_Param_Text"],
+    "Numeric": ["Auto_Param_Numeric"],
+    "Comparison": ['==', '!=', '>=', '<=', '>', '<']  # All comparison operators
+}
+
+# The generated Datatypes subdivision always uses this PK so it lines up with existing dumps
+DATATYPES_SUBDIVISION_PK = "307965"
 
 def generate_unique_pk():
     """Generates a unique primary key."""
@@ -82,28 +97,186 @@ def create_datatype_element(name, pk, uid, representatives, datatype_mapping, re
 
 # ... [Previous imports and functions] ...
 
+def representative_name(value):
+    """Normalizes a parameter value to the representative name used for lookups."""
+    return (value or '').strip().strip('"')
+
+def partition_datatype_values(operation_parameters):
+    """
+    Plans one narrow datatype per operation and parameter position.
+
+    Positions that only ever receive empty values are left out; they keep
+    using the Empty datatype.
+
+    Returns:
+        dict: Mapping from (operation name, position) to (datatype name, representative names).
+    """
+    partitions = {}
+    for operation_name, op_data in operation_parameters.items():
+        for idx, values in op_data['param_values'].items():
+            if not any(values):
+                continue
+            partitions[(operation_name, idx)] = (f"{operation_name}.Param{idx+1}", list(values))
+    return partitions
+
+def build_call_interaction(operation_name, interaction_info, call):
+    """Builds the test case interaction entry for one operation call."""
+    return {
+        'name': operation_name,
+        'pk': interaction_info['pk'],
+        'parameters': interaction_info['param_pks'],
+        'phase': 'Setup' if call['section'] == 'Precondition' else 'TestStep' if call['section'] == 'Action' else 'Teardown',
+        'param_details': call['param_details'],
+        'sheet': call.get('sheet')
+    }
+
+def get_sheet_names(data):
+    """Returns the sheet names of multi-sheet reader output in workbook order, or [] for a single sheet."""
+    return list(dict.fromkeys(
+        row_data['sheet'] for row_key, row_data in data.items()
+        if row_key != 'Generated_Parameters' and row_data.get('sheet') is not None
+    ))
+
+def collect_operation_parameters(data, progress=None, collect_values=False):
+    """
+    Aggregates the reader output per operation.
+
+    Records the parameter categories seen at each position, the sections
+    an operation appears in, the first sheet using it and every call. With
+    collect_values, the distinct representative names used at each
+    position are recorded too, in order of first use.
+
+    Returns:
+        dict: Mapping from operation name to 'param_positions', 'calls',
+        'sections', 'sheet' and, with collect_values, 'param_values'.
+    """
+    operation_parameters = {}  # Mapping from operation name to parameters and their categories
+    tracker = ProgressTracker(progress, 'aggregate', len(data) - ('Generated_Parameters' in data), 'rows')
+    for row_key in data:
+        if row_key == 'Generated_Parameters':
+            continue  # Skip Generated_Parameters, they become datatypes
+        tracker.advance()
+        row_data = data[row_key]
+
+        test_elements_data = row_data.get('test-elements', {})
+        sections = ['Precondition', 'Action', 'Expected_Result']
+        for section in sections:
+            operations = test_elements_data.get(section, {}).get('Operations', [])
+            for operation in operations:
+                operation_name = operation['operation']
+                parameters = operation.get('parameters', [])
+                param_details_list = operation.get('param_details', [])
+                if operation_name not in operation_parameters:
+                    operation_parameters[operation_name] = {
+                        'param_positions': defaultdict(set),
+                        'calls': [],
+                        'sections': set(),
+                        'sheet': row_data.get('sheet')
+                    }
+                    if collect_values:
+                        operation_parameters[operation_name]['param_values'] = defaultdict(dict)
+                # Record parameter categories at each position
+                for idx, param_detail in enumerate(param_details_list):
+                    category = param_detail.get('category', 'Empty')
+                    operation_parameters[operation_name]['param_positions'][idx].add(category)
+                    if collect_values:
+                        rep_name = representative_name(param_detail.get('value'))
+                        operation_parameters[operation_name]['param_values'][idx].setdefault(rep_name, None)
+                # Store the operation call for later
+                operation_parameters[operation_name]['calls'].append({
+                    'section': section,
+                    'operation': operation_name,
+                    'parameters': parameters,
+                    'param_details': param_details_list,
+                    'sheet': row_data.get('sheet')
+                })
+                # Record the section
+                operation_parameters[operation_name]['sections'].add(section)
+    tracker.finish()
+
+    return operation_parameters
+
+def plan_conversion(data, progress=None, partition_datatypes=False):
+    """
+    Reports what a conversion of the reader output would produce, without building XML.
+
+    Runs only the first-pass aggregation of generate_test_elements_xml, with
+    the same partition_datatypes choice.
+
+    Returns:
+        dict: Counts of rows, calls, call-parameters, interactions and their
+        parameters, representatives per datatype, and the parameter
+        positions that fall back to the Text datatype because of mixed categories.
+    """
+    operation_parameters = collect_operation_parameters(data, progress, partition_datatypes)
+
+    datatypes = {}
+    generated_params = {} if partition_datatypes else data.get('Generated_Parameters', {})
+    for param_name, param_values in generated_params.items():
+        datatypes[param_name] = len(param_values) + ("" not in param_values)
+    for datatype_name, default_representatives in DEFAULT_DATATYPES.items():
+        if partition_datatypes and datatype_name != "Empty":
+            continue
+        datatypes.setdefault(datatype_name, len(default_representatives))
+    partitions = partition_datatype_values(operation_parameters) if partition_datatypes else {}
+    for datatype_name, representatives in partitions.values():
+        datatypes[datatype_name] = len(representatives)
+
+    interactions = {}
+    text_fallbacks = []
+    call_parameters = 0
+    for operation_name, op_data in operation_parameters.items():
+        param_positions = op_data['param_positions']
+        interactions[operation_name] = {
+            'parameters': max(param_positions.keys()) + 1,
+            'calls': len(op_data['calls'])
+        }
+        call_parameters += sum(len(call['param_details']) for call in op_data['calls'])
+        for idx in sorted(param_positions):
+            if len(param_positions[idx]) > 1 and (operation_name, idx) not in partitions:
+                text_fallbacks.append({
+                    'interaction': operation_name,
+                    'parameter': f"Param{idx+1}",
+                    'categories': sorted(param_positions[idx])
+                })
+
+    return {
+        'rows': len(data) - ('Generated_Parameters' in data),
+        'calls': sum(info['calls'] for info in interactions.values()),
+        'call_parameters': call_parameters,
+        'interactions': interactions,
+        'interaction_parameters': sum(info['parameters'] for info in interactions.values()),
+        'datatypes': datatypes,
+        'text_fallbacks': text_fallbacks
+    }
+
 # Main function to generate the test elements XML structure
-def generate_test_elements_xml(data):
+def generate_test_elements_xml(data, progress=None, partition_datatypes=False):
+    """
+    Generates the test-elements XML and the mappings needed for the test case.
+
+    With partition_datatypes, the workbook-wide Text/Numeric/Comparison
+    datatypes are replaced by one datatype per operation and parameter
+    position, holding only the values used there (see partition_datatype_values).
+    """
     test_elements = Element("test-elements")
     datatype_mapping = {}  # Mapping from datatype names to PKs
     representative_mapping = {}  # Mapping from datatype to representative name to PK
-    parameter_mapping = {}    # Mapping from parameter PK to parameter details
-    operation_parameters = {}  # Mapping from operation name to parameters and their categories
 
     # Process Data Types first to build datatype_mapping
     datatype_subdivision = SubElement(test_elements, "element", type="subdivision")
-    SubElement(datatype_subdivision, "pk").text = "307965"
+    SubElement(datatype_subdivision, "pk").text = DATATYPES_SUBDIVISION_PK
     SubElement(datatype_subdivision, "name").text = "Datatypes"
-    SubElement(datatype_subdivision, "uid").text = "iTB-SD-307965"
+    SubElement(datatype_subdivision, "uid").text = "iTB-SD-" + DATATYPES_SUBDIVISION_PK
     SubElement(datatype_subdivision, "locker")
     SubElement(datatype_subdivision, "description")
     SubElement(datatype_subdivision, "html-description").text = "<html><body></body></html>"
-    SubElement(datatype_subdivision, "historyPK").text = "307965"
+    SubElement(datatype_subdivision, "historyPK").text = DATATYPES_SUBDIVISION_PK
     SubElement(datatype_subdivision, "identicalVersionPK").text = "-1"
     SubElement(datatype_subdivision, "references")
     SubElement(datatype_subdivision, "old-versions")
 
-    generated_params = data.get('Generated_Parameters', {})
+    generated_params = {} if partition_datatypes else data.get('Generated_Parameters', {})
     for param_name, param_values in generated_params.items():
         # Ensure empty strings are included in representatives if needed
         if "" not in param_values:
@@ -119,100 +292,46 @@ def generate_test_elements_xml(data):
         )
         datatype_subdivision.append(datatype_elem)
 
-    # Ensure "Empty" datatype is always created
-    if "Empty" not in datatype_mapping:
-        empty_datatype_pk = generate_unique_pk()
-        empty_datatype_elem = create_datatype_element(
-            "Empty",
-            empty_datatype_pk,
-            "iTB-DT-" + empty_datatype_pk[-6:],
-            [""],  # Representative is empty string
-            datatype_mapping,
-            representative_mapping
-        )
-        datatype_subdivision.append(empty_datatype_elem)
-
-    # Create a generic "Text" datatype with a default representative
-    if "Text" not in datatype_mapping:
-        text_datatype_pk = generate_unique_pk()
-        text_datatype_elem = create_datatype_element(
-            "Text",
-            text_datatype_pk,
-            "iTB-DT-" + text_datatype_pk[-6:],
-            ["Auto_Param_Text"],  # Add a default representative
+    # Ensure the "Empty", "Text", "Numeric" and "Comparison" datatypes always exist
+    for datatype_name, default_representatives in DEFAULT_DATATYPES.items():
+        if datatype_name in datatype_mapping or (partition_datatypes and datatype_name != "Empty"):
+            continue
+        default_datatype_pk = generate_unique_pk()
+        default_datatype_elem = create_datatype_element(
+            datatype_name,
+            default_datatype_pk,
+            "iTB-DT-" + default_datatype_pk[-6:],
+            list(default_representatives),
             datatype_mapping,
             representative_mapping
         )
-        datatype_subdivision.append(text_datatype_elem)
-
-    # Create a "Numeric" datatype with a default representative
-    if "Numeric" not in datatype_mapping:
-        numeric_datatype_pk = generate_unique_pk()
-        numeric_datatype_elem = create_datatype_element(
-            "Numeric",
-            numeric_datatype_pk,
-            "iTB-DT-" + numeric_datatype_pk[-6:],
-            ["Auto_Param_Numeric"],  # Add a default representative
-            datatype_mapping,
-            representative_mapping
-        )
-        datatype_subdivision.append(numeric_datatype_elem)
-
-    # Create a "Comparison" datatype with all comparison operators as representatives
-    if "Comparison" not in datatype_mapping:
-        comparison_datatype_pk = generate_unique_pk()
-        comparison_representatives = ['==', '!=', '>=', '<=', '>', '<']
-        comparison_datatype_elem = create_datatype_element(
-            "Comparison",
-            comparison_datatype_pk,
-            "iTB-DT-" + comparison_datatype_pk[-6:],
-            comparison_representatives,  # Add all comparison operators
-            datatype_mapping,
-            representative_mapping
-        )
-        datatype_subdivision.append(comparison_datatype_elem)
+        datatype_subdivision.append(default_datatype_elem)
 
     # Now process the interactions and collect interaction PKs and parameter PKs for test cases
     interactions = []
     interaction_mapping = {}  # Mapping from operation name to interaction data
 
     # First pass: Collect all parameters for each operation
-    for row_key in data:
-        if row_key == 'Generated_Parameters':
-            continue  # Skip Generated_Parameters, already processed
-        row_data = data[row_key]
+    operation_parameters = collect_operation_parameters(data, progress, partition_datatypes)
 
-        test_elements_data = row_data.get('test-elements', {})
-        sections = ['Precondition', 'Action', 'Expected_Result']
-        for section in sections:
-            operations = test_elements_data.get(section, {}).get('Operations', [])
-            for operation in operations:
-                operation_name = operation['operation']
-                parameters = operation.get('parameters', [])
-                param_details_list = operation.get('param_details', [])
-                if operation_name not in operation_parameters:
-                    operation_parameters[operation_name] = {
-                        'param_positions': defaultdict(set),
-                        'calls': [],
-                        'sections': set()
-                    }
-                # Record parameter categories at each position
-                for idx, param_detail in enumerate(param_details_list):
-                    category = param_detail.get('category', 'Empty')
-                    operation_parameters[operation_name]['param_positions'][idx].add(category)
-                # Store the operation call for later
-                operation_parameters[operation_name]['calls'].append({
-                    'section': section,
-                    'operation': operation_name,
-                    'parameters': parameters,
-                    'param_details': param_details_list
-                })
-                # Record the section
-                operation_parameters[operation_name]['sections'].add(section)
+    # Create the per-operation, per-position datatypes
+    partitions = partition_datatype_values(operation_parameters) if partition_datatypes else {}
+    for datatype_name, representatives in partitions.values():
+        datatype_pk = generate_unique_pk()
+        datatype_elem = create_datatype_element(
+            datatype_name,
+            datatype_pk,
+            "iTB-DT-" + datatype_pk[-6:],
+            representatives,
+            datatype_mapping,
+            representative_mapping
+        )
+        datatype_subdivision.append(datatype_elem)
 
-    # Create subdivisions for 'Precondition', 'Action', 'Expected_Result'
+    # Create subdivisions for 'Precondition', 'Action', 'Expected_Result', or one per sheet
+    sheet_names = get_sheet_names(data)
     subdivisions = {}
-    for section in ['Precondition', 'Action', 'Expected_Result']:
+    for section in sheet_names or ['Precondition', 'Action', 'Expected_Result']:
         subdivision = SubElement(test_elements, "element", type="subdivision")
         SubElement(subdivision, "pk").text = generate_unique_pk()
         SubElement(subdivision, "name").text = section
@@ -227,7 +346,9 @@ def generate_test_elements_xml(data):
         subdivisions[section] = subdivision
 
     # Second pass: Create interaction elements
+    tracker = ProgressTracker(progress, 'interactions', len(operation_parameters), 'interactions')
     for operation_name, op_data in operation_parameters.items():
+        tracker.advance()
         interaction_pk = generate_unique_pk()
         interaction_uid = "iTB-IA-" + interaction_pk[-6:]
 
@@ -262,12 +383,15 @@ def generate_test_elements_xml(data):
             # Set datatype-ref
             datatype_ref = SubElement(param_elem, "datatype-ref")
             categories = op_data['param_positions'][idx]
-            if len(categories) == 1:
+            datatype_name = partitions.get((operation_name, idx), (None, None))[0]
+            if datatype_name:
+                datatype_pk = datatype_mapping[datatype_name]
+            elif len(categories) == 1:
                 category = next(iter(categories))
                 datatype_pk = datatype_mapping.get(category, datatype_mapping['Empty'])
             else:
                 # Multiple categories, use 'Text' datatype
-                datatype_pk = datatype_mapping['Text']
+                datatype_pk = datatype_mapping.get('Text', datatype_mapping['Empty'])
             datatype_ref.set("pk", datatype_pk)
             SubElement(param_elem, "definition-type").text = "0"
             SubElement(param_elem, "use-type").text = "1"
@@ -279,14 +403,15 @@ def generate_test_elements_xml(data):
                 'pk': param_pk,
                 'name': param_elem_name,
                 'datatype_pk': datatype_pk,
+                'datatype_name': datatype_name,
                 'signature_uid': signature_uid
             })
 
         SubElement(interaction_elem, "call-sequence")
         SubElement(interaction_elem, "old-versions")
 
-        # Determine primary section
-        primary_section = next(iter(op_data['sections']))
+        # Determine primary section, or the first sheet using the operation
+        primary_section = op_data['sheet'] if sheet_names else next(iter(op_data['sections']))
 
         # Store interaction data
         interaction_mapping[operation_name] = {
@@ -296,6 +421,7 @@ def generate_test_elements_xml(data):
             'param_pks': param_pks,
             'primary_section': primary_section
         }
+    tracker.finish()
 
     # Append interaction elements to the appropriate subdivisions
     for operation_name, interaction_data in interaction_mapping.items():
@@ -305,16 +431,14 @@ def generate_test_elements_xml(data):
 
     # Build interactions list for test case
     interactions = []
+    parameter_mapping = {}  # Mapping from parameter PK to parameter details
+    total_calls = sum(len(op_data['calls']) for op_data in operation_parameters.values())
+    tracker = ProgressTracker(progress, 'calls', total_calls, 'calls')
     for operation_name, op_data in operation_parameters.items():
         interaction_info = interaction_mapping[operation_name]
         for call in op_data['calls']:
-            interactions.append({
-                'name': operation_name,
-                'pk': interaction_info['pk'],
-                'parameters': interaction_info['param_pks'],
-                'phase': 'Setup' if call['section'] == 'Precondition' else 'TestStep' if call['section'] == 'Action' else 'Teardown',
-                'param_details': call['param_details']
-            })
+            tracker.advance()
+            interactions.append(build_call_interaction(operation_name, interaction_info, call))
             # Map parameter PKs to their details
             for param_pk_info, param_detail in zip(interaction_info['param_pks'], call['param_details']):
                 param_pk = param_pk_info['pk']
@@ -325,12 +449,18 @@ def generate_test_elements_xml(data):
                     'value': param_detail.get('value', ''),
                     'signature_uid': param_pk_info['signature_uid']
                 }
+    tracker.finish()
 
     return test_elements, interactions, parameter_mapping, representative_mapping
 
 
 # Function to generate the test case XML
-def generate_test_case_xml(data, interactions, parameter_mapping, representative_mapping):
+def generate_test_case_xml(data, interactions, parameter_mapping, representative_mapping, progress=None, sheet=None):
+    """
+    Generates the testcase XML from the per-call interactions.
+
+    With sheet, only that sheet's calls are used and the testcase is named after it.
+    """
     testcase_pk, testcase_uid = generate_unique_pk(), generate_unique_pk()[-6:]
 
     # Create the root element
@@ -340,7 +470,7 @@ def generate_test_case_xml(data, interactions, parameter_mapping, representative
     SubElement(testcase, 'pk').text = str(testcase_pk)
 
     # Add the test case name
-    SubElement(testcase, 'name').text = "Generated Test Case"
+    SubElement(testcase, 'name').text = sheet if sheet is not None else "Generated Test Case"
 
     # Add order-pos
     SubElement(testcase, 'order-pos').text = '1024'
@@ -404,12 +534,18 @@ def generate_test_case_xml(data, interactions, parameter_mapping, representative
     # Call sequence
     call_sequence = SubElement(interaction, 'call-sequence')
 
-    # Sort interactions by phase and order (if needed)
+    # Sort interactions by phase, keeping their original order within a phase
     phase_order = {'Setup': 0, 'TestStep': 1, 'Teardown': 2}
-    interactions_sorted = sorted(interactions, key=lambda x: (phase_order.get(x['phase'], 99), interactions.index(x)))
+    if sheet is not None:
+        interactions = [x for x in interactions if x.get('sheet') == sheet]
+    interactions_sorted = sorted(interactions, key=lambda x: phase_order.get(x['phase'], 99))
+    total_calls = len(interactions_sorted)
 
     # Create interaction-call elements
+    unresolved = 0  # Call parameters whose value has no representative
+    tracker = ProgressTracker(progress, 'testcase', total_calls, 'calls')
     for interaction_info in interactions_sorted:
+        tracker.advance()
         interaction_call = SubElement(call_sequence, 'interaction-call')
         SubElement(interaction_call, 'interaction-ref', pk=str(interaction_info['pk']))
         SubElement(interaction_call, 'description')
@@ -434,16 +570,23 @@ def generate_test_case_xml(data, interactions, parameter_mapping, representative
             # Handle empty parameters
             if value is None:
                 value = ''
-            value = value.strip().strip('"')  # Trim whitespace and remove surrounding quotes
-            # Get the representative PK
-            rep_pk = representative_mapping.get(category, {}).get(value)
+            value = representative_name(value)  # Trim whitespace and remove surrounding quotes
+            # Get the representative PK, from the parameter's own datatype when partitioned
+            rep_pk = representative_mapping.get(param_info.get('datatype_name') or category, {}).get(value)
             if not rep_pk:
+                unresolved += 1
                 # If representative not found, use Empty datatype's representative
                 rep_pk = representative_mapping.get('Empty', {}).get('', '')
                 if not rep_pk:
                     rep_pk = generate_unique_pk()  # Generate a new PK if Empty datatype not found
             SubElement(call_parameter, 'representative-ref', pk=rep_pk)
         SubElement(interaction_call, 'marker')
+    tracker.finish()
+    if unresolved:
+        logging.warning(
+            f"{unresolved} call parameters had no matching representative and fell back to the Empty representative; "
+            f"run 'exceltodump verify' on the produced zip to check its references."
+        )
 
     # Add parameter-combinations
     parameter_combinations = SubElement(specification, 'parameter-combinations')
@@ -491,53 +634,472 @@ def generate_test_case_xml(data, interactions, parameter_mapping, representative
     return testcase
 
 
-def update_project_dump(test_elements_xml, testcase_xml, project_dump_path='project-dump.xml'):
-    """Replaces test-elements and testcase in project_dump.xml."""
-    try:
-        # Load the existing project_dump.xml
-        tree = parse(project_dump_path)
-        root = tree.getroot()
-
-        # Replace the <test-elements> section
-        test_elements_found = False
-        for parent in root.findall(".//test-elements/.."):
-            for elem in parent.findall("test-elements"):
-                parent.remove(elem)
-                test_elements_found = True
-
-        if not test_elements_found:
-            logging.warning("No 'test-elements' found in the project_dump.xml")
-
-        # Append new <test-elements>
-        test_elements_node = parse("output_test_elements.xml").getroot()
-        root.append(test_elements_node)
-
-        # Find the children node where test cases should go
-        children_found = False
-        for children_node in root.findall(".//children"):
-            # Replace or add <testcase> within the <children> node
-            children_node.clear()  # Clear existing children
-            testcase_node = parse("output_testcase.xml").getroot()
-            children_node.append(testcase_node)  # Append new test cases
-            children_found = True
-
-        if not children_found:
-            logging.warning("No 'children' node found in the project_dump.xml")
-
-        # Save the updated project_dump.xml
-        tree.write(project_dump_path, encoding="utf-8", xml_declaration=True)
-        logging.info(f"'{project_dump_path}' successfully updated with new test-elements and testcase.")
-
-    except FileNotFoundError:
-        logging.error(f"File '{project_dump_path}' not found.")
-    except Exception as e:
-        logging.error(f"Error updating '{project_dump_path}': {e}")
+def _as_testcase_list(testcase_xml):
+    """Accepts a single <testcase> element or a list of them (one per sheet)."""
+    return list(testcase_xml) if isinstance(testcase_xml, (list, tuple)) else [testcase_xml]
+
+def update_project_dump(test_elements_xml, testcase_xml, project_dump_path='project-dump.xml', progress=None):
+    """
+    Replaces test-elements and testcase (or a list of testcases) in project_dump.xml.
+
+    Errors are raised rather than logged, so a dump that could not be
+    updated is never zipped and reported as done.
+    """
+    tracker = ProgressTracker(progress, 'update', 3, 'steps')
+    # Load the existing project_dump.xml
+    tree = parse(project_dump_path)
+    root = tree.getroot()
+    tracker.advance()
+
+    # Replace the <test-elements> section
+    test_elements_found = False
+    for parent in root.findall(".//test-elements/.."):
+        for elem in parent.findall("test-elements"):
+            parent.remove(elem)
+            test_elements_found = True
+
+    if not test_elements_found:
+        logging.warning("No 'test-elements' found in the project_dump.xml")
+
+    # Append new <test-elements>
+    root.append(test_elements_xml)
+
+    # Find the children node where test cases should go
+    children_found = False
+    for children_node in root.findall(".//children"):
+        # Replace or add <testcase> within the <children> node
+        children_node.clear()  # Clear existing children
+        for testcase_node in _as_testcase_list(testcase_xml):
+            children_node.append(copy.deepcopy(testcase_node))  # Append new test cases
+        children_found = True
+
+    if not children_found:
+        logging.warning("No 'children' node found in the project_dump.xml")
+    tracker.advance()
+
+    # Save the updated project_dump.xml
+    tree.write(project_dump_path, encoding="utf-8", xml_declaration=True)
+    tracker.advance()
+    tracker.finish()
+    logging.info(f"'{project_dump_path}' successfully updated with new test-elements and testcase.")
+
+def _element_name(elem):
+    """Returns the stripped <name> text of an element, '' if it has none."""
+    return (elem.findtext("name") or "").strip()
+
+def index_test_elements(test_elements):
+    """
+    Builds name-keyed hash indexes over an existing <test-elements> section.
+
+    Args:
+        test_elements (Element): The <test-elements> node of a project dump.
+
+    Returns:
+        dict: 'subdivisions', 'datatypes' and 'interactions' map names to
+        elements; 'representatives' maps datatype name to representative
+        name to the <representatives> node and PK; 'parameters' maps
+        interaction name to parameter name to PK.
+    """
+    index = {
+        'subdivisions': {},
+        'datatypes': {},
+        'representatives': {},
+        'interactions': {},
+        'parameters': {}
+    }
+    for elem in test_elements.iter("element"):
+        elem_type = elem.get("type")
+        name = _element_name(elem)
+        if elem_type == "subdivision":
+            index['subdivisions'].setdefault(name, elem)
+        elif elem_type == "datatype":
+            if name in index['datatypes']:
+                continue
+            index['datatypes'][name] = elem
+            reps = {}
+            for representatives_elem in elem.iter("representatives"):
+                for representative in representatives_elem.findall("representative"):
+                    reps.setdefault(_element_name(representative), representative.findtext("pk"))
+            index['representatives'][name] = reps
+        elif elem_type == "interaction":
+            if name in index['interactions']:
+                continue
+            index['interactions'][name] = elem
+            index['parameters'][name] = {
+                _element_name(param): param.findtext("pk")
+                for param in elem.findall("parameters/parameter")
+            }
+    return index
+
+def _remap_pks(root, pk_remap):
+    """Rewrites <pk>/<historyPK> texts and pk attributes found in pk_remap."""
+    for elem in root.iter():
+        ref_pk = elem.get("pk")
+        if ref_pk in pk_remap:
+            elem.set("pk", pk_remap[ref_pk])
+        if elem.tag in ("pk", "historyPK") and elem.text in pk_remap:
+            elem.text = pk_remap[elem.text]
+
+def _merge_datatype(generated, existing, existing_reps, pk_remap):
+    """Reuses the PKs of an existing datatype and appends only new representatives."""
+    pk_remap[generated.findtext("pk")] = existing.findtext("pk")
+    target = existing.find(".//equivalence-class/representatives")
+    if target is None:
+        logging.warning(f"Datatype '{_element_name(existing)}' has no representatives node; skipping new representatives.")
+        return 0
+    next_ordering = len(target.findall("representative")) + 1
+    added = 0
+    for representative in generated.iter("representative"):
+        rep_name = _element_name(representative)
+        rep_pk = representative.findtext("pk")
+        if rep_name in existing_reps:
+            pk_remap[rep_pk] = existing_reps[rep_name]
+            continue
+        ordering = representative.find("ordering")
+        if ordering is not None:
+            ordering.text = str(next_ordering * 1024)
+        next_ordering += 1
+        target.append(representative)
+        existing_reps[rep_name] = rep_pk
+        added += 1
+    return added
+
+def _merge_interaction(generated, existing, existing_params, pk_remap):
+    """Reuses the PKs of an existing interaction and appends only new parameters."""
+    pk_remap[generated.findtext("pk")] = existing.findtext("pk")
+    target = existing.find("parameters")
+    if target is None:
+        target = SubElement(existing, "parameters")
+    added = 0
+    for param in generated.findall("parameters/parameter"):
+        param_name = _element_name(param)
+        param_pk = param.findtext("pk")
+        if param_name in existing_params:
+            pk_remap[param_pk] = existing_params[param_name]
+            continue
+        target.append(param)
+        existing_params[param_name] = param_pk
+        added += 1
+    return added
+
+def _align_representatives(test_elements, testcases):
+    """
+    Points call parameters at representatives of their parameter's datatype.
+
+    A reused parameter keeps the datatype it already had in the dump, which
+    can differ from the generated one (e.g. Text in the dump while the
+    workbook only passes Numeric values). Such calls are re-resolved by
+    representative name, adding the representative to the existing
+    datatype if it is missing there.
+
+    Returns:
+        int: Number of representatives added.
+    """
+    param_datatypes = {}   # Parameter PK to datatype PK
+    representatives = {}   # Representative PK to (datatype PK, name, element)
+    datatype_reps = {}     # Datatype PK to representative name to PK
+    rep_nodes = {}         # Datatype PK to its <representatives> node
+    for elem in test_elements.iter("element"):
+        if elem.get("type") == "interaction":
+            for param in elem.findall("parameters/parameter"):
+                datatype_ref = param.find("datatype-ref")
+                if datatype_ref is not None:
+                    param_datatypes[param.findtext("pk")] = datatype_ref.get("pk")
+        elif elem.get("type") == "datatype":
+            datatype_pk = elem.findtext("pk")
+            names = datatype_reps.setdefault(datatype_pk, {})
+            for representatives_elem in elem.iter("representatives"):
+                rep_nodes.setdefault(datatype_pk, representatives_elem)
+                for representative in representatives_elem.findall("representative"):
+                    rep_name = _element_name(representative)
+                    representatives[representative.findtext("pk")] = (datatype_pk, rep_name, representative)
+                    names.setdefault(rep_name, representative.findtext("pk"))
+
+    added = 0
+    for testcase_node in testcases:
+        for call_parameter in testcase_node.iter("call-parameter"):
+            param_ref = call_parameter.find("parameter-datatype-ref")
+            rep_ref = call_parameter.find("representative-ref")
+            if param_ref is None or rep_ref is None:
+                continue
+            datatype_pk = param_datatypes.get(param_ref.get("pk"))
+            current = representatives.get(rep_ref.get("pk"))
+            if datatype_pk is None or current is None or current[0] == datatype_pk:
+                continue
+            names = datatype_reps.setdefault(datatype_pk, {})
+            rep_pk = names.get(current[1])
+            if rep_pk is None and datatype_pk in rep_nodes:
+                representative = copy.deepcopy(current[2])
+                rep_pk = generate_unique_pk()
+                representative.find("pk").text = rep_pk
+                ordering = representative.find("ordering")
+                if ordering is not None:
+                    ordering.text = str((len(rep_nodes[datatype_pk].findall("representative")) + 1) * 1024)
+                rep_nodes[datatype_pk].append(representative)
+                representatives[rep_pk] = (datatype_pk, current[1], representative)
+                names[current[1]] = rep_pk
+                added += 1
+            if rep_pk is not None:
+                rep_ref.set("pk", rep_pk)
+    return added
+
+def _element_paths(root, targets):
+    """Maps each target element to its chain of ancestors below root, ending with the target itself."""
+    paths = {}
+    path = []
+
+    def walk(elem):
+        for child in elem:
+            path.append(child)
+            if child in targets:
+                paths[child] = list(path)
+            if len(paths) < len(targets):
+                walk(child)
+            path.pop()
+
+    walk(root)
+    return paths
+
+def _group_by_subdivision(test_elements_xml, items):
+    """Builds a <test-elements> node holding items under shells of their (dump) subdivisions."""
+    grouped = Element(test_elements_xml.tag, test_elements_xml.attrib)
+    shells = {}
+    for subdivision, elem in items:
+        if subdivision not in shells:
+            shells[subdivision] = SubElement(grouped, subdivision.tag, subdivision.attrib)
+            shells[subdivision].extend(child for child in subdivision if child.tag != "element")
+        shells[subdivision].append(elem)
+    return grouped
+
+def merge_project_dump(test_elements_xml, testcase_xml, project_dump_path='project-dump.xml', progress=None):
+    """
+    Merges test-elements and testcase into project_dump.xml without rebuilding it.
+
+    Existing datatypes, representatives, interactions and parameters are
+    matched by name and keep their PKs; only new items are appended. A
+    testcase with the same name is replaced in place, keeping its PK and
+    UID. Everything else in the dump is left untouched. Errors are raised
+    rather than logged, so a failed merge is never mistaken for a done one.
+
+    Args:
+        test_elements_xml (Element): Generated <test-elements> node.
+        testcase_xml (Element): Generated <testcase> node, or a list of them.
+        project_dump_path (str): Path to the project dump to update in place.
+        progress (callable, optional): Receives progress events for the 'update' stage.
+
+    Returns:
+        dict: 'pk_remap', mapping generated PKs to the existing PKs they were
+        replaced with; 'test_elements', a <test-elements> view of the merged
+        items as they now are in the dump, grouped under shells of the dump
+        subdivisions holding them; 'testcase_parents', mapping each placed
+        testcase PK to its ancestor chain below the root; and 'root_attributes'.
+    """
+    pk_remap = {}
+    tracker = ProgressTracker(progress, 'update', 3, 'steps')
+    tree = parse(project_dump_path)
+    root = tree.getroot()
+    tracker.advance()
+
+    existing_elements = root.find(".//test-elements")
+    if existing_elements is None:
+        logging.warning("No 'test-elements' found in the project_dump.xml; appending generated section.")
+        existing_elements = SubElement(root, "test-elements")
+    index = index_test_elements(existing_elements)
+
+    # Subdivision holding each existing item, so merged items can be reported where they live
+    parents = {
+        child: subdivision
+        for subdivision in existing_elements.iter("element") if subdivision.get("type") == "subdivision"
+        for child in subdivision.findall("element")
+    }
+
+    # First pass: match generated items against the index and collect what is new
+    new_items = []  # (subdivision name, generated subdivision, element)
+    merged_items = []  # (dump subdivision, merged element)
+    counts = defaultdict(int)
+    for subdivision in test_elements_xml.findall("element[@type='subdivision']"):
+        subdivision_name = _element_name(subdivision)
+        existing_subdivision = index['subdivisions'].get(subdivision_name)
+        if existing_subdivision is not None:
+            pk_remap[subdivision.findtext("pk")] = existing_subdivision.findtext("pk")
+        else:
+            existing_subdivision = subdivision
+        for elem in subdivision.findall("element"):
+            elem_type = elem.get("type")
+            name = _element_name(elem)
+            if elem_type == "datatype" and name in index['datatypes']:
+                counts['representatives'] += _merge_datatype(
+                    elem, index['datatypes'][name], index['representatives'][name], pk_remap)
+                existing = index['datatypes'][name]
+                merged_items.append((parents.get(existing, existing_subdivision), existing))
+            elif elem_type == "interaction" and name in index['interactions']:
+                counts['parameters'] += _merge_interaction(
+                    elem, index['interactions'][name], index['parameters'][name], pk_remap)
+                existing = index['interactions'][name]
+                merged_items.append((parents.get(existing, existing_subdivision), existing))
+            else:
+                new_items.append((subdivision_name, subdivision, elem))
+                counts[f"{elem_type}s"] += 1
+
+    # Point the generated trees at the reused PKs
+    _remap_pks(test_elements_xml, pk_remap)
+    testcases = _as_testcase_list(testcase_xml)
+    for testcase_node in testcases:
+        _remap_pks(testcase_node, pk_remap)
+
+    # Second pass: append only the new datatypes and interactions
+    for subdivision_name, generated_subdivision, elem in new_items:
+        target = index['subdivisions'].get(subdivision_name)
+        if target is None:
+            target = Element(generated_subdivision.tag, generated_subdivision.attrib)
+            for child in generated_subdivision:
+                if child.tag != "element":
+                    target.append(child)
+            existing_elements.append(target)
+            index['subdivisions'][subdivision_name] = target
+        target.append(elem)
+        merged_items.append((target, elem))
+
+    # Replace testcases of the same name, otherwise add them to the first test theme
+    existing_testcases = {}
+    for children_node in root.iter("children"):
+        for existing_testcase in children_node.findall("testcase"):
+            existing_testcases.setdefault(_element_name(existing_testcase), (children_node, existing_testcase))
+    theme_children = root.find(".//testtheme/children")
+    placed = {}  # Testcase PK to the <children> node it was put in
+    for testcase_node in testcases:
+        match = existing_testcases.get(_element_name(testcase_node))
+        if match is not None:
+            children_node, existing_testcase = match
+            for tag in ("pk", "uid"):
+                existing_value = existing_testcase.findtext(tag)
+                if existing_value and testcase_node.find(tag) is not None:
+                    testcase_node.find(tag).text = existing_value
+            position = list(children_node).index(existing_testcase)
+            children_node.remove(existing_testcase)
+            children_node.insert(position, testcase_node)
+            placed[testcase_node.findtext("pk")] = children_node
+        elif theme_children is None:
+            logging.warning("No test theme 'children' node found in the project_dump.xml")
+        else:
+            theme_children.append(testcase_node)
+            placed[testcase_node.findtext("pk")] = theme_children
+    counts['representatives'] += _align_representatives(existing_elements, testcases)
+    tracker.advance()
+
+    tree.write(project_dump_path, encoding="utf-8", xml_declaration=True)
+    tracker.advance()
+    tracker.finish()
+    logging.info(
+        f"'{project_dump_path}' merged: {counts['datatypes']} new datatypes, "
+        f"{counts['interactions']} new interactions, {counts['representatives']} new representatives, "
+        f"{counts['parameters']} new parameters, {len(pk_remap)} PKs reused."
+    )
+    paths = _element_paths(root, set(placed.values()))
+    return {
+        'pk_remap': pk_remap,
+        'test_elements': _group_by_subdivision(test_elements_xml, merged_items),
+        'testcase_parents': {pk: paths[children_node] for pk, children_node in placed.items()},
+        'root_attributes': dict(root.attrib)
+    }
 
 def zip_project_dump(project_dump_path='project-dump.xml', zip_path='project-dump.zip'):
-    """Zips the project_dump.xml into a zip file."""
-    try:
-        with zipfile.ZipFile(zip_path, 'w') as zipf:
-            zipf.write(project_dump_path, os.path.basename(project_dump_path))
-        logging.info(f"{zip_path} successfully created.")
-    except Exception as e:
-        logging.error(f"Error creating zip file: {e}")
+    """Zips the project_dump.xml into a zip file, raising on errors."""
+    with zipfile.ZipFile(zip_path, 'w') as zipf:
+        zipf.write(project_dump_path, os.path.basename(project_dump_path))
+    logging.info(f"{zip_path} successfully created.")
+
+def collect_dump_pks(project_dump_path):
+    """Returns every PK used in a project dump, scanning the raw file without building a tree."""
+    with open(project_dump_path, "rb") as f:
+        content = f.read()
+    return {
+        (text or attr).decode("ascii")
+        for text, attr in re.findall(rb"<(?:pk|historyPK)>\s*(\d+)\s*</|\bpk=\"(\d+)\"", content)
+    }
+
+def rekey_generated_xml(test_elements_xml, testcase_xml, taken_pks=()):
+    """
+    Gives the generated elements fresh PKs that collide with neither taken_pks nor each other.
+
+    UIDs derived from an element's own PK are updated with it. The fixed
+    Datatypes subdivision PK is kept so it still matches existing dumps.
+
+    Returns:
+        dict: Mapping of old PKs to the new ones.
+    """
+    used = set(taken_pks)
+    pk_remap = {}
+    roots = [test_elements_xml] + _as_testcase_list(testcase_xml)
+    for root in roots:
+        for pk_elem in root.iter("pk"):
+            old_pk = pk_elem.text
+            if not old_pk or old_pk == DATATYPES_SUBDIVISION_PK or old_pk in pk_remap:
+                continue
+            new_pk = generate_unique_pk()
+            while new_pk in used:
+                new_pk = generate_unique_pk()
+            used.add(new_pk)
+            pk_remap[old_pk] = new_pk
+
+    for root in roots:
+        for elem in root.iter():
+            uid_elem = elem.find("uid")
+            old_pk = elem.findtext("pk")
+            if uid_elem is not None and uid_elem.text and old_pk in pk_remap and uid_elem.text.endswith(old_pk[-6:]):
+                uid_elem.text = uid_elem.text[:-6] + pk_remap[old_pk][-6:]
+        _remap_pks(root, pk_remap)
+    return pk_remap
+
+def _fan_out_worker(test_elements_bytes, testcase_bytes, project_dump_path, zip_path, merge):
+    """Rekeys, updates and zips one project dump in a worker process."""
+    test_elements_xml = fromstring(test_elements_bytes)
+    testcase_xml = [fromstring(each) for each in testcase_bytes]
+    rekey_generated_xml(test_elements_xml, testcase_xml, collect_dump_pks(project_dump_path))
+    if merge:
+        merge_project_dump(test_elements_xml, testcase_xml, project_dump_path)
+    else:
+        update_project_dump(test_elements_xml, testcase_xml, project_dump_path)
+    zip_project_dump(project_dump_path, zip_path)
+    return zip_path
+
+def fan_out_project_dumps(test_elements_xml, testcase_xml, project_dump_paths, merge=False, workers=None, progress=None):
+    """
+    Applies one generated test-elements/testcase pair to several project dumps in parallel.
+
+    Each dump gets its own collision-free PKs (see rekey_generated_xml) and
+    is zipped next to itself, e.g. 'lab1/project-dump.xml' to 'lab1/project-dump.zip'.
+
+    Args:
+        test_elements_xml (Element): Generated <test-elements> node.
+        testcase_xml (Element): Generated <testcase> node, or a list of them.
+        project_dump_paths (list): Paths of the project dumps to update in place.
+        merge (bool): Merge instead of replacing, as in merge_project_dump.
+        workers (int, optional): Number of worker processes; defaults to the CPU count.
+        progress (callable, optional): Receives progress events for the 'fan-out' stage.
+
+    Returns:
+        dict: Mapping of project dump path to its zip path, for the dumps that succeeded.
+    """
+    test_elements_bytes = tostring(test_elements_xml, 'utf-8')
+    testcase_bytes = [tostring(testcase_node, 'utf-8') for testcase_node in _as_testcase_list(testcase_xml)]
+    zip_paths = {}
+    tracker = ProgressTracker(progress, 'fan-out', len(project_dump_paths), 'dumps', every=1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                _fan_out_worker, test_elements_bytes, testcase_bytes, path,
+                os.path.splitext(path)[0] + '.zip', merge
+            ): path
+            for path in project_dump_paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                zip_paths[path] = future.result()
+            except Exception as e:
+                logging.error(f"Error processing project dump '{path}': {e}")
+            tracker.advance()
+    tracker.finish()
+    return zip_paths
+
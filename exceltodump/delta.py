@@ -0,0 +1,206 @@
+# exceltodump/delta.py
+
+import hashlib
+import json
+import logging
+import os
+import zipfile
+from xml.etree.ElementTree import Element, SubElement, tostring
+from .converter import _element_name
+
+ITEM_KINDS = ('datatypes', 'interactions', 'testcases')
+
+# Ancestors of testcases in a project dump, and the children of those copied into a delta
+TESTCASE_PATH = ('testobjectversions', 'testobjectversion', 'testthemes', 'testtheme', 'children')
+TESTCASE_PATH_TAGS = ('pk', 'name', 'order-pos', 'uid')
+
+def _digest(content):
+    """Returns a stable SHA-256 hex digest of JSON-serializable content."""
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+def build_pk_index(test_elements_xml):
+    """Maps every datatype, representative, interaction and parameter PK to a readable name."""
+    names = {}
+    for elem in test_elements_xml.iter("element"):
+        elem_type = elem.get("type")
+        if elem_type == "datatype":
+            datatype_name = _element_name(elem)
+            names[elem.findtext("pk")] = datatype_name
+            for representative in elem.iter("representative"):
+                names[representative.findtext("pk")] = f"{datatype_name}/{_element_name(representative)}"
+        elif elem_type == "interaction":
+            interaction_name = _element_name(elem)
+            names[elem.findtext("pk")] = interaction_name
+            for param in elem.findall("parameters/parameter"):
+                names[param.findtext("pk")] = f"{interaction_name}/{_element_name(param)}"
+    return names
+
+def fingerprint_test_elements(test_elements_xml, pk_names=None):
+    """
+    Computes a content hash for each generated datatype and interaction.
+
+    Hashes cover the element's own PK plus its content with references
+    resolved to names, so random child PKs of unchanged items never count
+    as a change while a re-keyed item always does.
+
+    Returns:
+        dict: {'datatypes': {name: {'pk', 'hash'}}, 'interactions': {...}}
+    """
+    if pk_names is None:
+        pk_names = build_pk_index(test_elements_xml)
+    fingerprints = {'datatypes': {}, 'interactions': {}}
+    for elem in test_elements_xml.iter("element"):
+        elem_type = elem.get("type")
+        pk = elem.findtext("pk")
+        if elem_type == "datatype":
+            content = [
+                (representative.findtext("pk"), _element_name(representative))
+                for representative in elem.iter("representative")
+            ]
+            fingerprints['datatypes'][_element_name(elem)] = {'pk': pk, 'hash': _digest([pk, content])}
+        elif elem_type == "interaction":
+            content = []
+            for param in elem.findall("parameters/parameter"):
+                datatype_ref = param.find("datatype-ref")
+                datatype_pk = datatype_ref.get("pk") if datatype_ref is not None else None
+                content.append((param.findtext("pk"), _element_name(param), pk_names.get(datatype_pk, datatype_pk)))
+            fingerprints['interactions'][_element_name(elem)] = {'pk': pk, 'hash': _digest([pk, content])}
+    return fingerprints
+
+def fingerprint_testcases(testcases, pk_names):
+    """Computes a content hash for each testcase from its resolved call sequence."""
+    fingerprints = {}
+    for testcase in testcases:
+        pk = testcase.findtext("pk")
+        calls = []
+        for call in testcase.iter("interaction-call"):
+            interaction_ref = call.find("interaction-ref")
+            interaction_pk = interaction_ref.get("pk") if interaction_ref is not None else None
+            params = []
+            for call_parameter in call.iter("call-parameter"):
+                refs = []
+                for tag in ("parameter-datatype-ref", "representative-ref"):
+                    ref = call_parameter.find(tag)
+                    ref_pk = ref.get("pk") if ref is not None else None
+                    refs.append(pk_names.get(ref_pk, ref_pk))
+                params.append(refs)
+            calls.append((pk_names.get(interaction_pk, interaction_pk), call.findtext("phase"), params))
+        fingerprints[_element_name(testcase)] = {'pk': pk, 'hash': _digest([pk, calls])}
+    return fingerprints
+
+def fingerprint_run(test_elements_xml, testcases):
+    """Fingerprints the generated datatypes, interactions and testcases of one run."""
+    pk_names = build_pk_index(test_elements_xml)
+    fingerprints = fingerprint_test_elements(test_elements_xml, pk_names)
+    fingerprints['testcases'] = fingerprint_testcases(testcases, pk_names)
+    return fingerprints
+
+def load_state(state_path):
+    """Loads the fingerprints of the previous run, or empty ones if there is none."""
+    if not state_path or not os.path.isfile(state_path):
+        logging.info("No previous delta state found; every item will be reported as added.")
+        return {kind: {} for kind in ITEM_KINDS}
+    with open(state_path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    return {kind: state.get(kind, {}) for kind in ITEM_KINDS}
+
+def save_state(fingerprints, state_path):
+    """Writes the fingerprints of this run for the next delta comparison."""
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
+
+def compute_changes(previous, current):
+    """
+    Compares two fingerprint sets by name and content hash.
+
+    Returns:
+        dict: 'added', 'changed' and 'removed' name lists per item kind,
+        plus an 'unchanged' count per item kind.
+    """
+    changes = {'added': {}, 'changed': {}, 'removed': {}, 'unchanged': {}}
+    for kind in ITEM_KINDS:
+        old, new = previous.get(kind, {}), current.get(kind, {})
+        changes['added'][kind] = sorted(name for name in new if name not in old)
+        changes['changed'][kind] = sorted(
+            name for name in new if name in old and old[name]['hash'] != new[name]['hash']
+        )
+        changes['removed'][kind] = sorted(name for name in old if name not in new)
+        changes['unchanged'][kind] = len(new) - len(changes['added'][kind]) - len(changes['changed'][kind])
+    return changes
+
+def _testcase_parent(root, chain, copies):
+    """Returns the delta's copy of a dump's <children> node, copying its ancestors once."""
+    parent = root
+    for elem in chain:
+        key = id(elem)
+        if key not in copies:
+            shell = SubElement(parent, elem.tag, elem.attrib)
+            if elem.tag != "children":
+                for child in elem:
+                    if child.tag in TESTCASE_PATH_TAGS:
+                        SubElement(shell, child.tag, child.attrib).text = child.text
+            copies[key] = shell
+        parent = copies[key]
+    return parent
+
+def build_delta_dump(test_elements_xml, testcases, changes, testcase_parents=None, root_attributes=None):
+    """
+    Builds a minimal project dump holding only added or changed items.
+
+    Datatypes and interactions are placed in copies of the subdivisions
+    holding them in test_elements_xml. Testcases are placed under a copy of
+    the testobjectversion/testtheme path they have in the dump, keeping
+    only the identifying children of each ancestor.
+
+    Args:
+        test_elements_xml (Element): The merged <test-elements> view returned by merge_project_dump.
+        testcases (list): Generated <testcase> nodes.
+        changes (dict): Result of compute_changes.
+        testcase_parents (dict, optional): Testcase PK to its ancestor chain in
+            the dump, as returned by merge_project_dump; testcases without
+            one get the standard testtheme path.
+        root_attributes (dict, optional): Attributes of the dump's root element.
+
+    Returns:
+        Element: The <project-dump> root of the delta dump.
+    """
+    wanted = {
+        kind: set(changes['added'][kind]) | set(changes['changed'][kind])
+        for kind in ITEM_KINDS
+    }
+    root = Element("project-dump", root_attributes or {})
+    delta_elements = SubElement(root, "test-elements")
+
+    for subdivision in test_elements_xml.findall("element[@type='subdivision']"):
+        selected = [
+            elem for elem in subdivision.findall("element")
+            if _element_name(elem) in wanted.get(f"{elem.get('type')}s", ())
+        ]
+        if not selected:
+            continue
+        delta_subdivision = SubElement(delta_elements, subdivision.tag, subdivision.attrib)
+        for child in subdivision:
+            if child.tag != "element":
+                delta_subdivision.append(child)
+        delta_subdivision.extend(selected)
+
+    testcase_parents = testcase_parents or {}
+    default = [Element(tag) for tag in TESTCASE_PATH]
+    copies = {}
+    for testcase in testcases:
+        if _element_name(testcase) in wanted['testcases']:
+            chain = testcase_parents.get(testcase.findtext("pk"), default)
+            _testcase_parent(root, chain, copies).append(testcase)
+    return root
+
+def write_delta_zip(delta_root, changes, zip_path='project-dump-delta.zip', dump_name='project-dump.xml'):
+    """
+    Zips the delta dump together with a machine-readable changes.json.
+
+    Errors are raised rather than logged, so the caller does not record the
+    run's state for a delta that was never written.
+    """
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        zipf.writestr(dump_name, tostring(delta_root, 'utf-8', xml_declaration=True))
+        zipf.writestr('changes.json', json.dumps(changes, indent=2, sort_keys=True))
+    logging.info(f"{zip_path} successfully created.")
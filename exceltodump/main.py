@@ -9,10 +9,25 @@ from .converter import (
     generate_test_elements_xml, 
     generate_test_case_xml, 
     update_project_dump, 
-    zip_project_dump
+    merge_project_dump,
+    zip_project_dump,
+    fan_out_project_dumps,
+    plan_conversion,
+    get_sheet_names
 )
-from xml.etree.ElementTree import tostring
+from .delta import (
+    fingerprint_run,
+    load_state,
+    save_state,
+    compute_changes,
+    build_delta_dump,
+    write_delta_zip
+)
+from .verify import verify_project_dump, format_problems
+from .progress import progress_line_printer, json_lines_writer, combine_callbacks
+from xml.etree.ElementTree import Element, tostring
 import xml.dom.minidom
+import json
 
 def setup_logging():
     """Configures the logging settings."""
@@ -27,44 +42,95 @@ def pretty_xml(element):
     reparsed = xml.dom.minidom.parseString(rough_string)
     return reparsed.toprettyxml(indent="  ")
 
-def main():
-    setup_logging()
+def format_plan(plan):
+    """Returns a human-readable summary of a conversion plan."""
+    lines = [
+        f"Rows: {plan['rows']}",
+        f"Calls: {plan['calls']} ({plan['call_parameters']} call-parameters)",
+        f"Interactions: {len(plan['interactions'])} ({plan['interaction_parameters']} parameters)"
+    ]
+    for name, info in plan['interactions'].items():
+        lines.append(f"  {name}: {info['parameters']} parameters, {info['calls']} calls")
+    lines.append(f"Datatypes: {len(plan['datatypes'])}")
+    for name, representatives in plan['datatypes'].items():
+        lines.append(f"  {name}: {representatives} representatives")
+    lines.append(f"Parameters falling back to Text (mixed categories): {len(plan['text_fallbacks'])}")
+    for fallback in plan['text_fallbacks']:
+        lines.append(f"  {fallback['interaction']} {fallback['parameter']}: {', '.join(fallback['categories'])}")
+    return "\n".join(lines)
 
+def parse_sheet_names(value):
+    """Parses the comma-separated --sheets value into a list of sheet names."""
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    if not names:
+        raise argparse.ArgumentTypeError("expected at least one sheet name")
+    return names
+
+def verify_main(argv):
+    """Runs the 'verify' subcommand and exits non-zero if any problem is found."""
     parser = argparse.ArgumentParser(
-        description='Convert Excel test cases to project_dump.xml and generate project-dump.zip.'
+        prog='exceltodump verify',
+        description='Check a produced project-dump.zip (or project_dump.xml) for dangling and duplicate references.'
     )
-    parser.add_argument('excel_file', help='Path to the Excel file containing test cases.')
-    parser.add_argument('project_dump', help='Path to the existing project_dump.xml file.')
-
-    args = parser.parse_args()
-
-    excel_file = args.excel_file
-    project_dump = args.project_dump
+    parser.add_argument('dump', help='Path to project-dump.zip or project_dump.xml.')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON.')
+    parser.add_argument(
+        '--progress', action='store_true',
+        help='Print a rate-limited progress line with throughput to stderr.'
+    )
+    args = parser.parse_args(argv)
 
-    # Check if Excel file exists
-    if not os.path.isfile(excel_file):
-        logging.error(f"Excel file '{excel_file}' does not exist.")
+    if not os.path.isfile(args.dump):
+        logging.error(f"File '{args.dump}' does not exist.")
+        sys.exit(1)
+    try:
+        report = verify_project_dump(args.dump, progress=progress_line_printer() if args.progress else None)
+    except Exception as e:
+        logging.error(f"Failed to verify '{args.dump}': {e}")
         sys.exit(1)
 
-    # Check if project_dump.xml exists
-    if not os.path.isfile(project_dump):
-        logging.error(f"Project dump file '{project_dump}' does not exist.")
+    if args.json:
+        print(json.dumps(report, indent=2))
+    elif report['problems']:
+        print(format_problems(report))
+    if report['problems']:
         sys.exit(1)
 
+def convert(args, progress):
+    """Runs the conversion steps for parsed and validated command-line arguments."""
+    excel_file = args.excel_file
+    project_dumps = args.project_dumps
+    project_dump = project_dumps[0] if project_dumps else None
+
     try:
         # Step 1: Read and process the Excel file
         logging.info(f"Running reader.py with Excel file '{excel_file}'")
-        data = read_excel(excel_file)
+        data = read_excel(
+            excel_file, progress=progress, sheets=args.sheets,
+            all_sheets=args.all_sheets, workers=args.workers
+        )
         logging.debug(f"Data extracted from Excel: {data}")
     except Exception as e:
         logging.error(f"Failed to read and process Excel file: {e}")
         sys.exit(1)
 
+    if args.plan:
+        try:
+            # Dry run: aggregate only, skipping XML, dump update and zipping
+            plan = plan_conversion(data, progress=progress, partition_datatypes=args.partition_datatypes)
+        except Exception as e:
+            logging.error(f"Failed to plan the conversion: {e}")
+            sys.exit(1)
+        print(json.dumps(plan, indent=2) if args.plan_json else format_plan(plan))
+        return
+
     try:
         # Step 2: Generate test_elements XML
         logging.info("Generating test elements XML.")
-        test_elements_xml, interactions, parameter_mapping, representative_mapping = generate_test_elements_xml(data)
+        test_elements_xml, interactions, parameter_mapping, representative_mapping = generate_test_elements_xml(
+            data, progress=progress, partition_datatypes=args.partition_datatypes)
         logging.debug("Test elements XML generated.")
+        sheet_names = get_sheet_names(data)
     except Exception as e:
         logging.error(f"Failed to generate test elements XML: {e}")
         sys.exit(1)
@@ -82,7 +148,16 @@ def main():
     try:
         # Step 4: Generate test case XML
         logging.info("Generating test case XML.")
-        testcase_xml = generate_test_case_xml(data, interactions, parameter_mapping, representative_mapping)
+        if sheet_names:
+            # One testcase per sheet
+            testcase_xml = [
+                generate_test_case_xml(
+                    data, interactions, parameter_mapping, representative_mapping, progress=progress, sheet=sheet)
+                for sheet in sheet_names
+            ]
+        else:
+            testcase_xml = generate_test_case_xml(
+                data, interactions, parameter_mapping, representative_mapping, progress=progress)
         logging.debug("Test case XML generated.")
     except Exception as e:
         logging.error(f"Failed to generate test case XML: {e}")
@@ -91,21 +166,69 @@ def main():
     try:
         # Step 5: Serialize and write test case XML to file
         logging.info("Writing 'output_testcase.xml'.")
+        testcase_output = testcase_xml
+        if sheet_names:
+            testcase_output = Element("testcases")
+            testcase_output.extend(testcase_xml)
         with open("output_testcase.xml", "w", encoding="utf-8") as f:
-            f.write(pretty_xml(testcase_xml))
+            f.write(pretty_xml(testcase_output))
         logging.info("XML file 'output_testcase.xml' generated successfully.")
     except Exception as e:
         logging.error(f"Failed to write 'output_testcase.xml': {e}")
         sys.exit(1)
 
+    if len(project_dumps) > 1:
+        try:
+            # Steps 6-7: Update and zip every project dump in parallel, each with its own PKs
+            logging.info(f"Updating and zipping {len(project_dumps)} project dumps.")
+            zip_paths = fan_out_project_dumps(
+                test_elements_xml, testcase_xml, project_dumps,
+                merge=args.merge, workers=args.workers, progress=progress
+            )
+        except Exception as e:
+            logging.error(f"Failed to update project dumps: {e}")
+            sys.exit(1)
+
+        if len(zip_paths) != len(project_dumps):
+            logging.error(f"{len(project_dumps) - len(zip_paths)} of {len(project_dumps)} project dumps failed.")
+            sys.exit(1)
+        logging.info(f"Process completed successfully. Created: {', '.join(zip_paths[path] for path in project_dumps)}.")
+        return
+
     try:
         # Step 6: Update project_dump.xml
-        logging.info(f"Updating project dump '{project_dump}'.")
-        update_project_dump(test_elements_xml, testcase_xml, project_dump)
+        if args.merge:
+            logging.info(f"Merging into project dump '{project_dump}'.")
+            merged = merge_project_dump(test_elements_xml, testcase_xml, project_dump, progress=progress)
+        else:
+            logging.info(f"Updating project dump '{project_dump}'.")
+            update_project_dump(test_elements_xml, testcase_xml, project_dump, progress=progress)
     except Exception as e:
         logging.error(f"Failed to update project dump: {e}")
         sys.exit(1)
 
+    if args.delta:
+        try:
+            # Step 7: Zip only what changed since the previous run
+            logging.info(f"Comparing against previous run state '{args.delta}'.")
+            testcases = testcase_xml if sheet_names else [testcase_xml]
+            # The dump's versions of the items, including representatives the merge added
+            fingerprints = fingerprint_run(merged['test_elements'], testcases)
+            changes = compute_changes(load_state(args.delta), fingerprints)
+            for kind, names in changes['added'].items():
+                logging.info(f"{kind}: {len(names)} added, {len(changes['changed'][kind])} changed, "
+                             f"{len(changes['removed'][kind])} removed, {changes['unchanged'][kind]} unchanged.")
+            delta_root = build_delta_dump(
+                merged['test_elements'], testcases, changes, merged['testcase_parents'], merged['root_attributes'])
+            write_delta_zip(delta_root, changes, 'project-dump-delta.zip', os.path.basename(project_dump))
+            save_state(fingerprints, args.delta)
+        except Exception as e:
+            logging.error(f"Failed to create delta zip file: {e}")
+            sys.exit(1)
+
+        logging.info("Process completed successfully. 'project-dump-delta.zip' has been created.")
+        return
+
     try:
         # Step 7: Zip the updated project_dump.xml
         logging.info("Zipping the updated project dump.")
@@ -116,5 +239,118 @@ def main():
 
     logging.info("Process completed successfully. 'project-dump.zip' has been created.")
 
+def main():
+    setup_logging()
+
+    if sys.argv[1:2] == ['verify']:
+        verify_main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description='Convert Excel test cases to project_dump.xml and generate project-dump.zip.'
+    )
+    parser.add_argument('excel_file', help='Path to the Excel file containing test cases.')
+    parser.add_argument(
+        'project_dumps', nargs='*', metavar='project_dump',
+        help='Path to the existing project_dump.xml file; several may be given (not needed with --plan).'
+    )
+    parser.add_argument(
+        '--plan', action='store_true',
+        help='Only report what the conversion would produce, without building XML or touching the dump.'
+    )
+    parser.add_argument(
+        '--plan-json', action='store_true',
+        help='Like --plan, but print the report as JSON.'
+    )
+    parser.add_argument(
+        '--merge', action='store_true',
+        help='Merge into the existing test-elements and testcases, reusing PKs of items with the same name.'
+    )
+    parser.add_argument(
+        '--delta', metavar='STATE_FILE',
+        help='Write project-dump-delta.zip with only the items changed since the run recorded in STATE_FILE '
+             '(requires --merge).'
+    )
+    parser.add_argument(
+        '--progress', action='store_true',
+        help='Print a rate-limited progress line with throughput to stderr.'
+    )
+    parser.add_argument(
+        '--progress-json', metavar='PATH',
+        help="Write every progress event as a JSON line to PATH ('-' for stdout, not with --plan)."
+    )
+    parser.add_argument(
+        '--sheets', metavar='SHEET[,SHEET...]', type=parse_sheet_names,
+        help='Read the named sheets, given as one comma-separated list; each becomes its own testcase.'
+    )
+    parser.add_argument(
+        '--all-sheets', action='store_true',
+        help='Read every sheet of the workbook; each becomes its own testcase.'
+    )
+    parser.add_argument(
+        '--partition-datatypes', action='store_true',
+        help='Create one datatype per interaction parameter, holding only the values used there, '
+             'instead of shared Text/Numeric/Comparison datatypes.'
+    )
+    parser.add_argument(
+        '--workers', type=int,
+        help='Number of worker processes used for several sheets or project dumps (default: CPU count).'
+    )
+
+    # Intermixed, so project dumps may also follow options such as --sheets
+    args = parser.parse_intermixed_args()
+    args.plan = args.plan or args.plan_json
+
+    excel_file = args.excel_file
+    project_dumps = args.project_dumps
+
+    # Check if Excel file exists
+    if not os.path.isfile(excel_file):
+        logging.error(f"Excel file '{excel_file}' does not exist.")
+        sys.exit(1)
+
+    # Check if project_dump.xml exists
+    if not args.plan and not project_dumps:
+        logging.error("A project dump file is required unless --plan is given.")
+        sys.exit(1)
+    for path in ([] if args.plan else project_dumps):
+        if not os.path.isfile(path):
+            logging.error(f"Project dump file '{path}' does not exist.")
+            sys.exit(1)
+    if len({os.path.realpath(path) for path in project_dumps}) != len(project_dumps):
+        # Two workers would rewrite and zip the same file at once
+        logging.error("Each project dump may only be given once.")
+        sys.exit(1)
+    if args.delta and len(project_dumps) > 1:
+        logging.error("--delta supports a single project dump.")
+        sys.exit(1)
+    if args.delta and not args.merge:
+        # Without --merge every run gets fresh PKs, so every item would count as changed
+        logging.error("--delta requires --merge.")
+        sys.exit(1)
+
+    if args.sheets and args.all_sheets:
+        logging.error("--sheets and --all-sheets cannot be combined.")
+        sys.exit(1)
+
+    if args.progress_json == '-' and args.plan:
+        # The plan report would land in the JSON-lines stream on stdout, leaving it unparseable
+        logging.error("--progress-json - cannot be combined with --plan or --plan-json; write progress to a file instead.")
+        sys.exit(1)
+
+    progress_stream = None
+    if args.progress_json:
+        progress_stream = sys.stdout if args.progress_json == '-' else open(args.progress_json, "w", encoding="utf-8")
+    progress = combine_callbacks(
+        progress_line_printer() if args.progress else None,
+        json_lines_writer(progress_stream) if progress_stream else None
+    )
+
+    try:
+        convert(args, progress)
+    finally:
+        if progress_stream is not None and progress_stream is not sys.stdout:
+            progress_stream.close()
+
 if __name__ == "__main__":
     main()
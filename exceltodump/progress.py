@@ -0,0 +1,93 @@
+# exceltodump/progress.py
+
+import json
+import sys
+import time
+
+class ProgressTracker:
+    """
+    Counts work items for one conversion stage and emits throttled progress events.
+
+    The callback receives a dict with 'stage', 'unit', 'done', 'total',
+    'elapsed', 'rate' (items per second) and 'finished'. Events are only
+    built every `every` items, so advance() costs a counter increment and
+    a comparison inside the hot loops. Without a callback nothing is emitted.
+    """
+
+    def __init__(self, callback, stage, total=None, unit='items', every=None):
+        self.callback = callback
+        self.stage = stage
+        self.total = total
+        self.unit = unit
+        self.done = 0
+        if every is None:
+            every = max(1, total // 200) if total else 1000
+        self.every = every
+        self.started = time.perf_counter()
+        self._next = every if callback else float('inf')
+        if callback:
+            self._emit(False)
+
+    def advance(self, count=1):
+        """Records finished items, emitting an event when the next threshold is crossed."""
+        self.done += count
+        if self.done >= self._next:
+            self._next = self.done + self.every
+            self._emit(False)
+
+    def finish(self):
+        """Emits the final event for this stage."""
+        if self.callback:
+            self._emit(True)
+
+    def _emit(self, finished):
+        elapsed = time.perf_counter() - self.started
+        self.callback({
+            'stage': self.stage,
+            'unit': self.unit,
+            'done': self.done,
+            'total': self.total,
+            'elapsed': round(elapsed, 3),
+            'rate': round(self.done / elapsed, 1) if elapsed > 0 else None,
+            'finished': finished
+        })
+
+def progress_line_printer(stream=sys.stderr, min_interval=1.0):
+    """Returns a callback that prints at most one progress line per interval, plus each stage's final line."""
+    last_printed = [0.0]
+
+    def callback(event):
+        now = time.perf_counter()
+        if not event['finished'] and now - last_printed[0] < min_interval:
+            return
+        last_printed[0] = now
+        total = f"/{event['total']}" if event['total'] is not None else ""
+        percent = f" ({100 * event['done'] / event['total']:.0f}%)" if event['total'] else ""
+        rate = f", {event['rate']:.0f} {event['unit']}/s" if event['rate'] else ""
+        state = " done" if event['finished'] else ""
+        stream.write(f"[{event['stage']}] {event['done']}{total} {event['unit']}{percent}{rate}{state}\n")
+        stream.flush()
+
+    return callback
+
+def json_lines_writer(stream):
+    """Returns a callback that writes every progress event as one JSON line."""
+    def callback(event):
+        stream.write(json.dumps(event) + "\n")
+        stream.flush()
+
+    return callback
+
+def combine_callbacks(*callbacks):
+    """Combines several progress callbacks into one, skipping any that are None."""
+    callbacks = [callback for callback in callbacks if callback]
+    if not callbacks:
+        return None
+    if len(callbacks) == 1:
+        return callbacks[0]
+
+    def callback(event):
+        for each in callbacks:
+            each(event)
+
+    return callback
@@ -4,6 +4,8 @@ import json
 import pandas as pd
 import re
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from .progress import ProgressTracker
 
 # Define regex patterns
 op_pattern = r"#op\[(.*?)\]\((.*?)\)"       # Match operations like #op[Op Name](Op Param)
@@ -95,35 +97,30 @@ def extract_operations_params(text, categorized_params):
 
     return descriptions, cleaned_operations, categorized_params
 
-def read_excel(file_path):
+def new_categorized_params():
+    """Returns an empty registry of categorized parameter values."""
+    return {
+        "Text": [],
+        "Numeric": [],
+        "Comparison": []
+    }
+
+def extract_rows(excel_data, categorized_params, tracker=None, sheet_name=None):
     """
-    Reads the Excel file and processes it to generate output_data.
+    Extracts test-elements and testcase operations from every row of one sheet.
 
     Args:
-        file_path (str): Path to the Excel file.
+        excel_data (DataFrame): The sheet's rows.
+        categorized_params (dict): Registry the parameter values are added to.
+        tracker (ProgressTracker, optional): Advanced once per row.
+        sheet_name (str, optional): Set on every row and used to prefix its key
+            when several sheets are read.
 
     Returns:
-        dict: Processed data.
+        dict: Row key to row data.
     """
-    try:
-        excel_data = pd.read_excel(file_path)
-        logging.info(f"Excel file '{file_path}' loaded successfully.")
-    except FileNotFoundError:
-        logging.error(f"Excel file '{file_path}' not found.")
-        raise
-    except Exception as e:
-        logging.error(f"Error loading Excel file '{file_path}': {e}")
-        raise
-
-    # Prepare dictionary to store the data
-    output_data = {}
-
-    # Global categorized parameters
-    categorized_params = {
-        "Text": [],
-        "Numeric": [],
-        "Comparison": []
-    }
+    rows = {}
+    key_prefix = f"{sheet_name}/" if sheet_name is not None else ""
 
     # Apply extraction to the 'Precondition', 'Action', and 'Expected Result' columns
     for index, row in excel_data.iterrows():
@@ -167,10 +164,85 @@ def read_excel(file_path):
         # Add test-elements and testcase to row_data
         row_data['test-elements'] = test_elements
         row_data['testcase'] = test_case_operations
+        if sheet_name is not None:
+            row_data['sheet'] = sheet_name
 
         # Add row data to output if it contains any extracted information
         if row_data:
-            output_data[f"Row_{index}"] = row_data
+            rows[f"{key_prefix}Row_{index}"] = row_data
+        if tracker is not None:
+            tracker.advance()
+
+    return rows
+
+def _extract_sheet(sheet_name, excel_data):
+    """Extracts one sheet with its own registry; runs in a worker process."""
+    categorized_params = new_categorized_params()
+    rows = extract_rows(excel_data, categorized_params, sheet_name=sheet_name)
+    return rows, categorized_params
+
+def read_excel(file_path, progress=None, sheets=None, all_sheets=False, workers=None):
+    """
+    Reads the Excel file and processes it to generate output_data.
+
+    By default only the first sheet is read. With sheets or all_sheets, the
+    workbook is opened once, the selected sheets are extracted concurrently
+    in worker processes, and their parameter values are merged into one
+    deduplicated registry in sheet order. Each row then carries its 'sheet'.
+
+    Args:
+        file_path (str): Path to the Excel file.
+        progress (callable, optional): Receives progress events for the 'read' stage.
+        sheets (list, optional): Names of the sheets to read.
+        all_sheets (bool): Read every sheet of the workbook.
+        workers (int, optional): Number of worker processes for several sheets.
+
+    Returns:
+        dict: Processed data.
+    """
+    multi_sheet = all_sheets or sheets is not None
+    try:
+        if multi_sheet:
+            with pd.ExcelFile(file_path) as workbook:
+                sheet_names = workbook.sheet_names if all_sheets else list(sheets)
+                missing = [name for name in sheet_names if name not in workbook.sheet_names]
+                if missing:
+                    raise ValueError(f"Sheets not found in workbook: {', '.join(missing)}")
+                sheet_data = {name: workbook.parse(name) for name in sheet_names}
+        else:
+            excel_data = pd.read_excel(file_path)
+        logging.info(f"Excel file '{file_path}' loaded successfully.")
+    except FileNotFoundError:
+        logging.error(f"Excel file '{file_path}' not found.")
+        raise
+    except Exception as e:
+        logging.error(f"Error loading Excel file '{file_path}': {e}")
+        raise
+
+    # Prepare dictionary to store the data
+    output_data = {}
+
+    # Global categorized parameters
+    categorized_params = new_categorized_params()
+
+    if not multi_sheet:
+        tracker = ProgressTracker(progress, 'read', len(excel_data), 'rows')
+        output_data.update(extract_rows(excel_data, categorized_params, tracker))
+        tracker.finish()
+    else:
+        tracker = ProgressTracker(progress, 'read', sum(len(df) for df in sheet_data.values()), 'rows', every=1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {name: executor.submit(_extract_sheet, name, df) for name, df in sheet_data.items()}
+            # Merge in sheet order so the shared registry is deterministic
+            for name, future in futures.items():
+                rows, sheet_params = future.result()
+                output_data.update(rows)
+                for category, values in sheet_params.items():
+                    known = set(categorized_params[category])
+                    categorized_params[category].extend(value for value in values if value not in known)
+                tracker.advance(len(sheet_data[name]))
+                logging.info(f"Sheet '{name}': {len(rows)} rows extracted.")
+        tracker.finish()
 
     # Add the grouped global parameters to the output data
     output_data["Generated_Parameters"] = {
@@ -0,0 +1,272 @@
+# exceltodump/verify.py
+
+import logging
+import os
+import zipfile
+from xml.parsers import expat
+from .progress import ProgressTracker
+
+CHUNK_SIZE = 1 << 20  # Bytes fed to the parser at a time
+MAX_LOCATIONS = 20    # Locations kept per unresolved PK; the rest are only counted
+
+# Reference tags and the kind of element their pk attribute must point at
+REFERENCE_KINDS = {
+    'interaction-ref': 'interaction',
+    'parameter-datatype-ref': 'parameter',
+    'representative-ref': 'representative',
+    'datatype-ref': 'datatype',
+    'default-representative-ref': 'representative'
+}
+
+# Elements whose PKs are only checked for duplicates; nothing references them
+CHECKED_FOR_DUPLICATES = ('testcase', 'interaction-call', 'call-parameter')
+
+class _Frame:
+    __slots__ = ('tag', 'kind', 'name', 'pk', 'line', 'refs')
+
+    def __init__(self, tag, kind=None):
+        self.tag = tag
+        self.kind = kind
+        self.name = None
+        self.pk = None
+        self.line = None
+        self.refs = None
+
+class _IntegrityScanner:
+    """Single-pass expat handler collecting defined PKs and checking references against them."""
+
+    def __init__(self):
+        self.defined = {}    # PK to (kind, member, line) of its first definition
+        self.pending = {}    # (tag, PK) to [count, locations] of references seen before any definition
+        self.representative_datatypes = {}  # Representative PK to the PK of the datatype holding it
+        self.parameter_datatypes = {}       # Parameter PK to the PK of its datatype-ref
+        self.call_parameters = {}  # (parameter PK, representative PK) to [count, locations], checked in finish()
+        self.problems = []
+        self.references = 0
+        self.member = None
+        self.parser = None
+        self._stack = []
+        self._text = None
+
+    def scan(self, stream, member, tracker=None):
+        """Feeds one XML stream through a fresh parser."""
+        self.member = member
+        self._stack = []
+        self.parser = expat.ParserCreate()
+        self.parser.buffer_text = True
+        self.parser.StartElementHandler = self._start
+        self.parser.EndElementHandler = self._end
+        self.parser.CharacterDataHandler = self._characters
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            self.parser.Parse(chunk, False)
+            if tracker is not None:
+                tracker.advance(len(chunk))
+        self.parser.Parse(b"", True)
+
+    def _location(self, line=None):
+        """Returns 'member:line' plus the name of the innermost named element, if any."""
+        location = f"{self.member}:{line or self.parser.CurrentLineNumber}"
+        for frame in reversed(self._stack):
+            if frame.name:
+                return f"{location} (in {frame.tag} '{frame.name}')"
+        return location
+
+    def _start(self, tag, attrs):
+        parent = self._stack[-1] if self._stack else None
+        kind = None
+        if tag == 'element' and attrs.get('type') in ('datatype', 'interaction'):
+            kind = attrs['type']
+        elif tag == 'parameter' and parent is not None and parent.tag == 'parameters':
+            kind = 'parameter'
+        elif tag == 'representative' and parent is not None and parent.tag == 'representatives':
+            kind = 'representative'
+        elif tag in CHECKED_FOR_DUPLICATES:
+            kind = tag
+        elif tag in ('pk', 'name') and parent is not None:
+            self._text = []
+        if tag in REFERENCE_KINDS:
+            self._check_reference(tag, attrs.get('pk'))
+            if parent is not None and parent.tag == 'call-parameter':
+                parent.refs[tag] = attrs.get('pk')
+            elif tag == 'datatype-ref' and parent is not None and parent.kind == 'parameter' and parent.pk:
+                self.parameter_datatypes.setdefault(parent.pk, attrs.get('pk'))
+        frame = _Frame(tag, kind)
+        if tag == 'call-parameter':
+            frame.line = self.parser.CurrentLineNumber
+            frame.refs = {}
+        self._stack.append(frame)
+
+    def _characters(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+    def _end(self, tag):
+        if tag == 'call-parameter':
+            self._check_call_parameter(self._stack[-1])
+        self._stack.pop()
+        if self._text is None or tag not in ('pk', 'name'):
+            return
+        text = "".join(self._text).strip()
+        self._text = None
+        parent = self._stack[-1]
+        if tag == 'name':
+            if parent.name is None:
+                parent.name = text
+        elif parent.kind is not None and parent.pk is None and text:
+            parent.pk = text  # Only the first <pk> of an element defines it
+            self._define(text, parent.kind)
+            if parent.kind == 'representative':
+                datatype = next((frame for frame in reversed(self._stack) if frame.kind == 'datatype'), None)
+                if datatype is not None and datatype.pk:
+                    self.representative_datatypes.setdefault(text, datatype.pk)
+
+    def _define(self, pk, kind):
+        line = self.parser.CurrentLineNumber
+        if pk in self.defined:
+            first_kind, first_member, first_line = self.defined[pk]
+            self.problems.append({
+                'problem': 'duplicate',
+                'kind': kind,
+                'pk': pk,
+                'location': self._location(),
+                'detail': f"already defined as {first_kind} at {first_member}:{first_line}"
+            })
+            return
+        self.defined[pk] = (kind, self.member, line)
+        for tag in REFERENCE_KINDS:
+            pending = self.pending.pop((tag, pk), None)
+            if pending is not None and REFERENCE_KINDS[tag] != kind:
+                self._wrong_kind(tag, pk, kind, *pending)
+
+    def _check_reference(self, tag, pk):
+        self.references += 1
+        if not pk:
+            self.problems.append({
+                'problem': 'dangling', 'kind': tag, 'pk': pk or '',
+                'location': self._location(), 'detail': "reference without a pk"
+            })
+            return
+        definition = self.defined.get(pk)
+        if definition is not None:
+            if definition[0] != REFERENCE_KINDS[tag]:
+                self._wrong_kind(tag, pk, definition[0], 1, [self._location()])
+            return
+        # Possibly a forward reference; resolved once the definition streams by
+        pending = self.pending.get((tag, pk))
+        if pending is None:
+            self.pending[(tag, pk)] = [1, [self._location()]]
+        else:
+            pending[0] += 1
+            if len(pending[1]) < MAX_LOCATIONS:
+                pending[1].append(self._location())
+
+    def _check_call_parameter(self, frame):
+        """Queues a call-parameter's (parameter, representative) pair for the datatype check in finish()."""
+        param_pk = frame.refs.get('parameter-datatype-ref')
+        rep_pk = frame.refs.get('representative-ref')
+        if not param_pk or not rep_pk:
+            return
+        # Testcases usually precede test-elements, so pairs are kept per distinct pair until the end
+        pending = self.call_parameters.get((param_pk, rep_pk))
+        if pending is None:
+            self.call_parameters[(param_pk, rep_pk)] = [1, [self._location(frame.line)]]
+        else:
+            pending[0] += 1
+            if len(pending[1]) < MAX_LOCATIONS:
+                pending[1].append(self._location(frame.line))
+
+    def _wrong_kind(self, tag, pk, defined_kind, count, locations):
+        for location in locations:
+            self.problems.append({
+                'problem': 'wrong-kind', 'kind': tag, 'pk': pk, 'location': location,
+                'detail': f"points at a {defined_kind}, expected a {REFERENCE_KINDS[tag]}"
+            })
+        if count > len(locations):
+            self.problems[-1]['detail'] += f" ({count - len(locations)} more references not listed)"
+
+    def finish(self):
+        """Reports the references whose PK was never defined and representatives outside their parameter's datatype."""
+        for (tag, pk), (count, locations) in self.pending.items():
+            for location in locations:
+                self.problems.append({
+                    'problem': 'dangling', 'kind': tag, 'pk': pk, 'location': location,
+                    'detail': f"no {REFERENCE_KINDS[tag]} with this pk"
+                })
+            if count > len(locations):
+                self.problems[-1]['detail'] += f" ({count - len(locations)} more references not listed)"
+        self.pending = {}
+        for (param_pk, rep_pk), (count, locations) in self.call_parameters.items():
+            param_datatype = self.parameter_datatypes.get(param_pk)
+            rep_datatype = self.representative_datatypes.get(rep_pk)
+            if param_datatype is None or rep_datatype is None or param_datatype == rep_datatype:
+                continue  # Unknown PKs are already reported as dangling
+            for location in locations:
+                self.problems.append({
+                    'problem': 'wrong-datatype', 'kind': 'representative-ref', 'pk': rep_pk, 'location': location,
+                    'detail': f"representative of datatype {rep_datatype}, but parameter {param_pk} "
+                              f"has datatype {param_datatype}"
+                })
+            if count > len(locations):
+                self.problems[-1]['detail'] += f" ({count - len(locations)} more references not listed)"
+        self.call_parameters = {}
+
+def verify_project_dump(path, progress=None):
+    """
+    Checks the references of a project dump zip (or a plain project dump XML).
+
+    Every XML member is streamed once through an expat parser. Defined
+    datatype, interaction, parameter and representative PKs (and testcase,
+    interaction-call and call-parameter PKs, for the duplicate check) go
+    into a hash map, and each interaction-ref, parameter-datatype-ref,
+    representative-ref, datatype-ref and default-representative-ref is
+    checked against it.
+    References seen before their definition are kept per tag and PK, with
+    at most MAX_LOCATIONS locations each, so memory grows with the number
+    of distinct PKs rather than with the number of references. Each
+    call-parameter's representative must also belong to the datatype its
+    parameter references; these pairs are likewise kept per distinct pair
+    and checked once the whole dump has streamed by.
+
+    Args:
+        path (str): Path to project-dump.zip or project_dump.xml.
+        progress (callable, optional): Receives progress events for the 'verify' stage.
+
+    Returns:
+        dict: 'definitions' and 'references' counts, and 'problems', a list of
+        dicts with 'problem' ('dangling', 'duplicate', 'wrong-kind' or 'wrong-datatype'),
+        'kind' (the reference tag or defined kind), 'pk', 'location' and 'detail'.
+    """
+    scanner = _IntegrityScanner()
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            members = [info for info in archive.infolist() if info.filename.lower().endswith('.xml')]
+            tracker = ProgressTracker(progress, 'verify', sum(info.file_size for info in members), 'bytes')
+            for info in members:
+                with archive.open(info) as stream:
+                    scanner.scan(stream, info.filename, tracker)
+    else:
+        tracker = ProgressTracker(progress, 'verify', os.path.getsize(path), 'bytes')
+        with open(path, 'rb') as stream:
+            scanner.scan(stream, os.path.basename(path), tracker)
+    tracker.finish()
+    scanner.finish()
+
+    logging.info(
+        f"Verified '{path}': {len(scanner.defined)} definitions, {scanner.references} references, "
+        f"{len(scanner.problems)} problems."
+    )
+    return {
+        'definitions': len(scanner.defined),
+        'references': scanner.references,
+        'problems': scanner.problems
+    }
+
+def format_problems(report):
+    """Returns one human-readable line per problem of a verify_project_dump report."""
+    return "\n".join(
+        f"{problem['location']}: {problem['problem']} {problem['kind']} pk={problem['pk']}: {problem['detail']}"
+        for problem in report['problems']
+    )
@@ -0,0 +1,79 @@
+# tests/test_delta.py
+
+import copy
+
+from exceltodump.converter import generate_test_elements_xml, generate_test_case_xml, merge_project_dump
+from exceltodump.delta import fingerprint_run, compute_changes, build_delta_dump, ITEM_KINDS
+
+from test_merge import PROJECT_DUMP, DATA, EMPTY
+
+def merge_and_fingerprint(path, previous, data=DATA):
+    data = copy.deepcopy(data)
+    test_elements_xml, interactions, parameter_mapping, representative_mapping = generate_test_elements_xml(data)
+    testcase_xml = generate_test_case_xml(data, interactions, parameter_mapping, representative_mapping)
+    merged = merge_project_dump(test_elements_xml, testcase_xml, str(path))
+    fingerprints = fingerprint_run(merged['test_elements'], [testcase_xml])
+    changes = compute_changes(previous, fingerprints)
+    delta_root = build_delta_dump(
+        merged['test_elements'], [testcase_xml], changes, merged['testcase_parents'], merged['root_attributes'])
+    return fingerprints, changes, delta_root
+
+def test_unchanged_rerun_produces_empty_delta(tmp_path):
+    path = tmp_path / "project-dump.xml"
+    path.write_text(PROJECT_DUMP, encoding="utf-8")
+    first, _, _ = merge_and_fingerprint(path, {kind: {} for kind in ITEM_KINDS})
+    _, changes, delta_root = merge_and_fingerprint(path, first)
+
+    for kind in ITEM_KINDS:
+        assert changes['added'][kind] == []
+        assert changes['changed'][kind] == []
+    assert delta_root.find("test-elements/element") is None
+    assert delta_root.find(".//testcase") is None
+
+def test_delta_includes_representatives_added_by_merge(tmp_path):
+    path = tmp_path / "project-dump.xml"
+    path.write_text(PROJECT_DUMP, encoding="utf-8")
+    _, _, delta_root = merge_and_fingerprint(path, {kind: {} for kind in ITEM_KINDS})
+
+    defined = {representative.findtext("pk") for representative in delta_root.iter("representative")}
+    referenced = {ref.get("pk") for ref in delta_root.iter("representative-ref")}
+    assert referenced
+    assert referenced <= defined
+
+def test_delta_testcases_keep_their_testtheme_path(tmp_path):
+    path = tmp_path / "project-dump.xml"
+    path.write_text(PROJECT_DUMP, encoding="utf-8")
+    _, _, delta_root = merge_and_fingerprint(path, {kind: {} for kind in ITEM_KINDS})
+
+    testcases = delta_root.findall("testobjectversions/testobjectversion/testthemes/testtheme/children/testcase")
+    assert [testcase.findtext("name") for testcase in testcases] == ["Generated Test Case"]
+    assert testcases[0].findtext("pk") == "501"
+    assert delta_root.findtext(".//testtheme/pk") == "1"
+    assert delta_root.find("children") is None
+    assert len(delta_root.findall(".//testcase")) == 1
+
+def test_delta_items_keep_their_dump_subdivisions(tmp_path):
+    path = tmp_path / "project-dump.xml"
+    path.write_text(PROJECT_DUMP, encoding="utf-8")
+    first, _, _ = merge_and_fingerprint(path, {kind: {} for kind in ITEM_KINDS})
+
+    # A new interaction and a new Text value on the second run
+    new_op = {
+        "operation": "New Op",
+        "parameters": ["Auto_Param_Text", "", "", "", ""],
+        "param_details": [{"category": "Text", "value": '"TV_New"'}] + [EMPTY] * 4
+    }
+    data = copy.deepcopy(DATA)
+    data["Row_1"] = {"test-elements": {"Action": {"Descriptions": [], "Operations": [new_op]}}, "testcase": [new_op]}
+    data["Generated_Parameters"]["Text"].append('"TV_New"')
+    _, changes, delta_root = merge_and_fingerprint(path, first, data)
+
+    assert changes['added']['interactions'] == ["New Op"]
+    assert "Text" in changes['changed']['datatypes']
+    subdivision_pks = {
+        elem.findtext("name"): subdivision.findtext("pk")
+        for subdivision in delta_root.findall("test-elements/element[@type='subdivision']")
+        for elem in subdivision.findall("element")
+    }
+    assert subdivision_pks["New Op"] == "11"
+    assert subdivision_pks["Text"] == "10"
@@ -0,0 +1,72 @@
+# tests/test_fan_out.py
+
+import copy
+import zipfile
+from collections import Counter
+
+from exceltodump.converter import (
+    generate_test_elements_xml, generate_test_case_xml, collect_dump_pks, rekey_generated_xml,
+    fan_out_project_dumps, DATATYPES_SUBDIVISION_PK
+)
+
+from test_merge import PROJECT_DUMP, DATA
+
+REFERENCE_TAGS = ("interaction-ref", "datatype-ref", "representative-ref")
+
+def generate():
+    data = copy.deepcopy(DATA)
+    test_elements_xml, interactions, parameter_mapping, representative_mapping = generate_test_elements_xml(data)
+    testcase_xml = generate_test_case_xml(data, interactions, parameter_mapping, representative_mapping)
+    return test_elements_xml, testcase_xml
+
+def own_pks(roots):
+    return [pk.text for root in roots for pk in root.iter("pk")]
+
+def derived_uids(roots):
+    """Maps every element whose UID ends with the last six digits of its own PK to that PK."""
+    return {
+        elem: elem.findtext("pk")
+        for root in roots for elem in root.iter()
+        if elem.findtext("pk") and (elem.findtext("uid") or "").endswith(elem.findtext("pk")[-6:])
+    }
+
+def test_rekey_avoids_taken_pks_and_keeps_references(tmp_path):
+    path = tmp_path / "project-dump.xml"
+    path.write_text(PROJECT_DUMP, encoding="utf-8")
+    test_elements_xml, testcase_xml = generate()
+    roots = [test_elements_xml, testcase_xml]
+    # Taking the generated PKs themselves forces every one of them to change
+    taken = collect_dump_pks(str(path)) | set(own_pks(roots))
+    assert {"20", "22", "31", "500"} <= taken
+    uids = derived_uids(roots)
+    assert uids
+
+    pk_remap = rekey_generated_xml(test_elements_xml, testcase_xml, taken)
+
+    pks = [pk for pk in own_pks(roots) if pk != DATATYPES_SUBDIVISION_PK]
+    assert not set(pks) & taken
+    assert not [pk for pk, count in Counter(pks).items() if count > 1]
+
+    defined = set(pks)
+    references = [ref.get("pk") for root in roots for tag in REFERENCE_TAGS for ref in root.iter(tag)]
+    assert references
+    assert set(references) <= defined
+
+    for elem, old_pk in uids.items():
+        new_pk = pk_remap.get(old_pk, old_pk)  # The fixed Datatypes subdivision PK is kept
+        assert elem.findtext("pk") == new_pk
+        assert elem.findtext("uid").endswith(new_pk[-6:])
+
+def test_broken_dump_is_not_reported_as_done(tmp_path):
+    good = tmp_path / "good" / "project-dump.xml"
+    broken = tmp_path / "broken" / "project-dump.xml"
+    for path, content in ((good, PROJECT_DUMP), (broken, "<broken")):
+        path.parent.mkdir()
+        path.write_text(content, encoding="utf-8")
+    test_elements_xml, testcase_xml = generate()
+
+    zip_paths = fan_out_project_dumps(test_elements_xml, testcase_xml, [str(good), str(broken)], workers=2)
+
+    assert zip_paths == {str(good): str(tmp_path / "good" / "project-dump.zip")}
+    assert zipfile.is_zipfile(zip_paths[str(good)])
+    assert not (tmp_path / "broken" / "project-dump.zip").exists()
@@ -0,0 +1,127 @@
+# tests/test_merge.py
+
+import copy
+from xml.etree.ElementTree import parse
+
+from exceltodump.converter import generate_test_elements_xml, generate_test_case_xml, merge_project_dump
+
+PROJECT_DUMP = """<?xml version="1.0" encoding="UTF-8"?>
+<project-dump version="3.0">
+  <testobjectversions><testobjectversion><testthemes><testtheme>
+    <pk>1</pk><name>Theme</name>
+    <children>
+      <testcase><pk>500</pk><name>First</name></testcase>
+      <testcase><pk>501</pk><name>Generated Test Case</name><uid>iTB-TC-000501</uid></testcase>
+      <testcase><pk>502</pk><name>Last</name></testcase>
+    </children>
+  </testtheme></testthemes></testobjectversion></testobjectversions>
+  <test-elements>
+    <element type="subdivision"><pk>10</pk><name>Datatypes</name>
+      <element type="datatype"><pk>20</pk><name>Text</name>
+        <equivalence-classes><equivalence-class><pk>21</pk><name>Text</name>
+          <representatives>
+            <representative><pk>22</pk><name>TV_Old</name><ordering>1024</ordering></representative>
+          </representatives>
+          <default-representative-ref pk="22"/>
+        </equivalence-class></equivalence-classes>
+      </element>
+    </element>
+    <element type="subdivision"><pk>11</pk><name>Action</name>
+      <element type="interaction"><pk>30</pk><name>Set Signal</name>
+        <parameters>
+          <parameter><pk>31</pk><name>Param1</name><datatype-ref pk="20"/></parameter>
+          <parameter><pk>32</pk><name>Param2</name><datatype-ref pk="20"/></parameter>
+        </parameters>
+      </element>
+    </element>
+  </test-elements>
+</project-dump>
+"""
+
+EMPTY = {"category": "Empty", "value": ""}
+# Param2 only ever receives a number, while the dump types it as Text
+OPERATION = {
+    "operation": "Set Signal",
+    "parameters": ["Auto_Param_Text", "Auto_Param_Numeric", "", "", ""],
+    "param_details": [{"category": "Text", "value": '"TV_A"'}, {"category": "Numeric", "value": "5"}] + [EMPTY] * 3
+}
+DATA = {
+    "Row_0": {
+        "test-elements": {"Action": {"Descriptions": [], "Operations": [OPERATION]}},
+        "testcase": [OPERATION]
+    },
+    "Generated_Parameters": {"Text": ['"TV_A"'], "Numeric": ["5"]}
+}
+
+def merge(path):
+    data = copy.deepcopy(DATA)
+    test_elements_xml, interactions, parameter_mapping, representative_mapping = generate_test_elements_xml(data)
+    testcase_xml = generate_test_case_xml(data, interactions, parameter_mapping, representative_mapping)
+    merge_project_dump(test_elements_xml, testcase_xml, str(path))
+    return parse(str(path)).getroot()
+
+def named_pks(root):
+    """Maps (kind, name path) to PK for every datatype, representative, interaction and parameter."""
+    pks = {}
+    for elem in root.find("test-elements").iter("element"):
+        name = elem.findtext("name")
+        if elem.get("type") == "datatype":
+            pks[("datatype", name)] = elem.findtext("pk")
+            for representative in elem.iter("representative"):
+                pks[("representative", name, representative.findtext("name"))] = representative.findtext("pk")
+        elif elem.get("type") == "interaction":
+            pks[("interaction", name)] = elem.findtext("pk")
+            for param in elem.findall("parameters/parameter"):
+                pks[("parameter", name, param.findtext("name"))] = param.findtext("pk")
+    return pks
+
+def test_merging_twice_keeps_pks_stable(tmp_path):
+    path = tmp_path / "project-dump.xml"
+    path.write_text(PROJECT_DUMP, encoding="utf-8")
+    first = merge(path)
+    second = merge(path)
+
+    assert named_pks(first) == named_pks(second)
+    assert named_pks(second)[("datatype", "Text")] == "20"
+    assert named_pks(second)[("parameter", "Set Signal", "Param2")] == "32"
+    assert len(second.findall(".//testtheme/children/testcase")) == 3
+
+def test_existing_testcase_is_replaced_in_place(tmp_path):
+    path = tmp_path / "project-dump.xml"
+    path.write_text(PROJECT_DUMP, encoding="utf-8")
+    root = merge(path)
+
+    testcases = root.findall(".//testtheme/children/testcase")
+    assert [testcase.findtext("name") for testcase in testcases] == ["First", "Generated Test Case", "Last"]
+    assert testcases[1].findtext("pk") == "501"
+    assert testcases[1].findtext("uid") == "iTB-TC-000501"
+    assert testcases[1].find(".//call-sequence/interaction-call") is not None
+
+def test_call_parameters_reference_their_parameters_datatype(tmp_path):
+    path = tmp_path / "project-dump.xml"
+    path.write_text(PROJECT_DUMP, encoding="utf-8")
+    root = merge(path)
+
+    test_elements = root.find("test-elements")
+    representative_datatypes = {}
+    representative_names = {}
+    for datatype in test_elements.iter("element"):
+        if datatype.get("type") == "datatype":
+            for representative in datatype.iter("representative"):
+                representative_datatypes[representative.findtext("pk")] = datatype.findtext("pk")
+                representative_names[representative.findtext("pk")] = representative.findtext("name")
+    parameter_datatypes = {
+        param.findtext("pk"): param.find("datatype-ref").get("pk") for param in test_elements.iter("parameter")
+    }
+
+    call_parameters = root.findall(".//testcase//call-parameter")
+    assert call_parameters
+    for call_parameter in call_parameters:
+        param_pk = call_parameter.find("parameter-datatype-ref").get("pk")
+        rep_pk = call_parameter.find("representative-ref").get("pk")
+        assert representative_datatypes[rep_pk] == parameter_datatypes[param_pk]
+
+    # The numeric value was added to the Text datatype the existing parameter keeps
+    param2 = [cp for cp in call_parameters if cp.find("parameter-datatype-ref").get("pk") == "32"]
+    assert [representative_names[cp.find("representative-ref").get("pk")] for cp in param2] == ["5"]
+    assert representative_datatypes[param2[0].find("representative-ref").get("pk")] == "20"
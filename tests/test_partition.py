@@ -0,0 +1,48 @@
+# tests/test_partition.py
+
+import copy
+
+from exceltodump.converter import generate_test_elements_xml, generate_test_case_xml
+
+from test_merge import DATA, OPERATION
+
+SECOND_OPERATION = dict(OPERATION, param_details=[{"category": "Text", "value": '"TV_B"'}] + OPERATION["param_details"][1:])
+
+def partitioned_data():
+    data = copy.deepcopy(DATA)
+    data["Row_1"] = {
+        "test-elements": {"Action": {"Descriptions": [], "Operations": [copy.deepcopy(SECOND_OPERATION)]}},
+        "testcase": [copy.deepcopy(SECOND_OPERATION)]
+    }
+    data["Generated_Parameters"]["Text"].append('"TV_B"')
+    return data
+
+def test_partitioned_parameters_use_their_own_datatypes():
+    data = partitioned_data()
+    test_elements_xml, interactions, parameter_mapping, representative_mapping = generate_test_elements_xml(
+        data, partition_datatypes=True)
+    testcase_xml = generate_test_case_xml(data, interactions, parameter_mapping, representative_mapping)
+
+    datatype_names = {}
+    representative_datatypes = {}
+    for datatype in test_elements_xml.iter("element"):
+        if datatype.get("type") == "datatype":
+            datatype_names[datatype.findtext("pk")] = datatype.findtext("name")
+            for representative in datatype.iter("representative"):
+                representative_datatypes[representative.findtext("pk")] = datatype.findtext("pk")
+    assert "Text" not in datatype_names.values()
+
+    parameter_datatypes = {}
+    for param in test_elements_xml.iter("parameter"):
+        parameter_datatypes[param.findtext("pk")] = param.find("datatype-ref").get("pk")
+        expected = "Set Signal." + param.findtext("name") if param.findtext("name") in ("Param1", "Param2") else "Empty"
+        assert datatype_names[parameter_datatypes[param.findtext("pk")]] == expected
+
+    call_parameters = testcase_xml.findall(".//call-parameter")
+    assert len(call_parameters) == 10
+    for call_parameter in call_parameters:
+        param_pk = call_parameter.find("parameter-datatype-ref").get("pk")
+        rep_pk = call_parameter.find("representative-ref").get("pk")
+        assert representative_datatypes[rep_pk] == parameter_datatypes[param_pk]
+    assert sorted(representative_mapping["Set Signal.Param1"]) == ["TV_A", "TV_B"]
+    assert list(representative_mapping["Set Signal.Param2"]) == ["5"]
@@ -0,0 +1,58 @@
+# tests/test_plan.py
+
+import copy
+from collections import Counter
+
+import pytest
+
+from exceltodump.converter import generate_test_elements_xml, generate_test_case_xml, plan_conversion
+
+from test_merge import OPERATION
+from test_partition import partitioned_data
+
+# Param2 receives a Text value here and a number elsewhere
+MIXED_OPERATION = dict(
+    OPERATION,
+    param_details=[OPERATION["param_details"][0], {"category": "Text", "value": '"TV_C"'}] + OPERATION["param_details"][2:]
+)
+
+def generated_counts(data, partition_datatypes):
+    test_elements_xml, interactions, parameter_mapping, representative_mapping = generate_test_elements_xml(
+        data, partition_datatypes=partition_datatypes)
+    testcase_xml = generate_test_case_xml(data, interactions, parameter_mapping, representative_mapping)
+
+    interaction_names = {}
+    counts = {'interactions': {}, 'datatypes': {}}
+    for elem in test_elements_xml.iter("element"):
+        if elem.get("type") == "interaction":
+            interaction_names[elem.findtext("pk")] = elem.findtext("name")
+            counts['interactions'][elem.findtext("name")] = {'parameters': len(elem.findall("parameters/parameter"))}
+        elif elem.get("type") == "datatype":
+            counts['datatypes'][elem.findtext("name")] = len(list(elem.iter("representative")))
+    calls = Counter(interaction_names[ref.get("pk")] for ref in testcase_xml.iter("interaction-ref"))
+    for name, info in counts['interactions'].items():
+        info['calls'] = calls[name]
+    counts['calls'] = sum(calls.values())
+    counts['call_parameters'] = len(list(testcase_xml.iter("call-parameter")))
+    counts['interaction_parameters'] = len(list(test_elements_xml.iter("parameter")))
+    return counts
+
+@pytest.mark.parametrize("partition_datatypes", [False, True])
+def test_plan_matches_generated_xml(partition_datatypes):
+    data = partitioned_data()
+    data["Row_2"] = {
+        "test-elements": {"Expected_Result": {"Descriptions": [], "Operations": [copy.deepcopy(MIXED_OPERATION)]}},
+        "testcase": [copy.deepcopy(MIXED_OPERATION)]
+    }
+    data["Generated_Parameters"]["Text"].append('"TV_C"')
+    plan = plan_conversion(copy.deepcopy(data), partition_datatypes=partition_datatypes)
+    counts = generated_counts(copy.deepcopy(data), partition_datatypes)
+
+    assert plan['rows'] == 3
+    for key, expected in counts.items():
+        assert plan[key] == expected, key
+    # Partitioned parameters get their own datatype instead of falling back to Text
+    expected_fallbacks = [] if partition_datatypes else [
+        {'interaction': 'Set Signal', 'parameter': 'Param2', 'categories': ['Numeric', 'Text']}
+    ]
+    assert plan['text_fallbacks'] == expected_fallbacks
@@ -0,0 +1,27 @@
+# tests/test_progress.py
+
+from exceltodump.progress import ProgressTracker
+
+def test_events_are_throttled_and_finished_once():
+    events = []
+    tracker = ProgressTracker(events.append, 'calls', total=10, unit='calls', every=3)
+    for _ in range(10):
+        tracker.advance()
+    tracker.finish()
+
+    assert [event['done'] for event in events] == [0, 3, 6, 9, 10]
+    assert [event['finished'] for event in events] == [False] * 4 + [True]
+    assert all(event['stage'] == 'calls' and event['unit'] == 'calls' and event['total'] == 10 for event in events)
+
+def test_default_interval_follows_total():
+    assert ProgressTracker(None, 'read', total=1000).every == 5
+    assert ProgressTracker(None, 'read', total=10).every == 1
+    assert ProgressTracker(None, 'read').every == 1000
+
+def test_without_callback_nothing_is_emitted():
+    tracker = ProgressTracker(None, 'calls', total=10, every=1)
+    for _ in range(10):
+        tracker.advance()
+    tracker.finish()
+
+    assert tracker.done == 10
@@ -0,0 +1,62 @@
+# tests/test_reader.py
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("openpyxl")
+
+from exceltodump.reader import read_excel
+from exceltodump.converter import generate_test_elements_xml, generate_test_case_xml, get_sheet_names
+
+SHEETS = {
+    "Setup": ['#op[Set Signal]("TV_A", 5)', '#op[Set Signal]("TV_B", 7)'],
+    "Regression": ['#op[Set Signal]("TV_B", 5)', '#op[Check Signal]("TV_C", ">=")']
+}
+
+def write_workbook(path):
+    with pd.ExcelWriter(path) as writer:
+        for name, actions in SHEETS.items():
+            empty = [""] * len(actions)
+            frame = pd.DataFrame({"Precondition": empty, "Action": actions, "Expected Result": empty})
+            frame.to_excel(writer, sheet_name=name, index=False)
+    return str(path)
+
+def test_sheets_share_one_registry_in_sheet_order(tmp_path):
+    path = write_workbook(tmp_path / "workbook.xlsx")
+
+    data = read_excel(path, all_sheets=True, workers=2)
+    assert data["Generated_Parameters"]["Text"] == ['"TV_A"', '"TV_B"', '"TV_C"']
+    assert data["Generated_Parameters"]["Numeric"] == ["5", "7"]
+    assert get_sheet_names(data) == ["Setup", "Regression"]
+    assert data["Regression/Row_1"]["sheet"] == "Regression"
+
+    data = read_excel(path, sheets=["Regression", "Setup"], workers=2)
+    assert data["Generated_Parameters"]["Text"] == ['"TV_B"', '"TV_C"', '"TV_A"']
+    assert get_sheet_names(data) == ["Regression", "Setup"]
+
+def test_each_sheet_gets_its_subdivision_and_testcase(tmp_path):
+    data = read_excel(write_workbook(tmp_path / "workbook.xlsx"), all_sheets=True, workers=2)
+    test_elements_xml, interactions, parameter_mapping, representative_mapping = generate_test_elements_xml(data)
+
+    subdivisions = {
+        subdivision.findtext("name"): [elem.findtext("name") for elem in subdivision.findall("element[@type='interaction']")]
+        for subdivision in test_elements_xml.findall("element[@type='subdivision']")
+    }
+    # Interactions live in the first sheet using them
+    assert subdivisions == {"Datatypes": [], "Setup": ["Set Signal"], "Regression": ["Check Signal"]}
+
+    interaction_names = {
+        elem.findtext("pk"): elem.findtext("name") for elem in test_elements_xml.iter("element")
+        if elem.get("type") == "interaction"
+    }
+    for sheet, expected in (("Setup", ["Set Signal", "Set Signal"]), ("Regression", ["Set Signal", "Check Signal"])):
+        testcase = generate_test_case_xml(
+            data, interactions, parameter_mapping, representative_mapping, sheet=sheet)
+        assert testcase.findtext("name") == sheet
+        assert [interaction_names[ref.get("pk")] for ref in testcase.iter("interaction-ref")] == expected
+
+def test_missing_sheet_is_an_error(tmp_path):
+    path = write_workbook(tmp_path / "workbook.xlsx")
+
+    with pytest.raises(ValueError, match="Sheets not found in workbook: Nightly"):
+        read_excel(path, sheets=["Setup", "Nightly"])
@@ -0,0 +1,103 @@
+# tests/test_verify.py
+
+import copy
+
+from exceltodump.converter import (
+    generate_test_elements_xml, generate_test_case_xml, update_project_dump, zip_project_dump
+)
+from exceltodump.verify import verify_project_dump, MAX_LOCATIONS
+
+from test_merge import PROJECT_DUMP as MERGE_DUMP, DATA
+
+def call_parameter(param_pk, rep_pk):
+    return (f'<call-parameter><pk>9{param_pk}{rep_pk}</pk><parameter-datatype-ref pk="{param_pk}"/>'
+            f'<representative-ref pk="{rep_pk}"/></call-parameter>')
+
+# The testcase comes first, so every reference in it is a forward reference
+PROJECT_DUMP = """<?xml version="1.0" encoding="UTF-8"?>
+<project-dump version="3.0">
+  <testcase><pk>500</pk><name>Generated Test Case</name>
+    <interaction-call><interaction-ref pk="30"/><parameter-values>
+      {resolved}
+      {empty_fallback}
+      {wrong_kind}
+    </parameter-values></interaction-call>
+    <interaction-call><interaction-ref pk="999"/></interaction-call>
+  </testcase>
+  <test-elements>
+    <element type="datatype"><pk>20</pk><name>Text</name>
+      <representatives><representative><pk>22</pk><name>TV_A</name></representative></representatives>
+      <default-representative-ref pk="22"/>
+    </element>
+    <element type="datatype"><pk>40</pk><name>Empty</name>
+      <representatives>
+        <representative><pk>42</pk><name></name></representative>
+        <representative><pk>22</pk><name>Copy</name></representative>
+      </representatives>
+    </element>
+    <element type="interaction"><pk>30</pk><name>Set Signal</name>
+      <parameters><parameter><pk>31</pk><name>Param1</name><datatype-ref pk="20"/></parameter></parameters>
+    </element>
+  </test-elements>
+</project-dump>
+""".format(
+    resolved=call_parameter("31", "22"),
+    empty_fallback=call_parameter("31", "42"),
+    wrong_kind=call_parameter("31", "30")
+)
+
+def problems(report, problem):
+    return [(p['kind'], p['pk']) for p in report['problems'] if p['problem'] == problem]
+
+def test_reports_each_kind_of_problem_once(tmp_path):
+    path = tmp_path / "project-dump.xml"
+    path.write_text(PROJECT_DUMP, encoding="utf-8")
+    report = verify_project_dump(str(path))
+
+    assert problems(report, 'dangling') == [("interaction-ref", "999")]
+    assert problems(report, 'duplicate') == [("representative", "22")]
+    assert problems(report, 'wrong-kind') == [("representative-ref", "30")]
+    # The Empty representative exists, but not in the parameter's Text datatype
+    assert problems(report, 'wrong-datatype') == [("representative-ref", "42")]
+    assert len(report['problems']) == 4
+    assert report['definitions'] == 10  # Including the testcase and its call-parameters
+
+def test_locations_are_capped_per_pk(tmp_path):
+    path = tmp_path / "project-dump.xml"
+    calls = '<interaction-ref pk="999"/>' * (MAX_LOCATIONS + 5)
+    path.write_text(f"<project-dump><testcase>{calls}</testcase></project-dump>", encoding="utf-8")
+    report = verify_project_dump(str(path))
+
+    assert report['references'] == MAX_LOCATIONS + 5
+    assert len(report['problems']) == MAX_LOCATIONS
+    assert report['problems'][-1]['detail'].endswith("(5 more references not listed)")
+
+def test_empty_fallback_in_generated_zip_is_reported(tmp_path):
+    path = tmp_path / "project-dump.xml"
+    path.write_text(MERGE_DUMP, encoding="utf-8")
+    data = copy.deepcopy(DATA)
+    data["Generated_Parameters"]["Text"] = ['"TV_Other"']  # TV_A has no representative
+    test_elements_xml, interactions, parameter_mapping, representative_mapping = generate_test_elements_xml(data)
+    testcase_xml = generate_test_case_xml(data, interactions, parameter_mapping, representative_mapping)
+    update_project_dump(test_elements_xml, testcase_xml, str(path))
+    zip_path = tmp_path / "project-dump.zip"
+    zip_project_dump(str(path), str(zip_path))
+    report = verify_project_dump(str(zip_path))
+
+    assert [p['problem'] for p in report['problems']] == ['wrong-datatype']
+    assert report['problems'][0]['pk'] == representative_mapping['Empty']['']
+
+def test_update_writing_the_testcase_twice_is_a_duplicate(tmp_path):
+    path = tmp_path / "project-dump.xml"
+    # update_project_dump fills every <children> node with the same testcases
+    path.write_text(MERGE_DUMP.replace("<testthemes><testtheme>", "<testthemes><testtheme><children/>"), encoding="utf-8")
+    data = copy.deepcopy(DATA)
+    test_elements_xml, interactions, parameter_mapping, representative_mapping = generate_test_elements_xml(data)
+    testcase_xml = generate_test_case_xml(data, interactions, parameter_mapping, representative_mapping)
+    update_project_dump(test_elements_xml, testcase_xml, str(path))
+    report = verify_project_dump(str(path))
+
+    duplicates = problems(report, 'duplicate')
+    assert ("testcase", testcase_xml.findtext("pk")) in duplicates
+    assert {kind for kind, _ in duplicates} == {"testcase", "call-parameter"}
+    assert len(duplicates) == 1 + len(testcase_xml.findall(".//call-parameter"))